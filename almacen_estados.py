@@ -0,0 +1,83 @@
+import threading
+
+
+class AlmacenEstados:
+    """Diccionario robot_id -> valor repartido en shards, cada uno con su lock
+
+    Sustituye a los dict compartidos (estados_robot, clientes) que mutaban a la
+    vez los hilos de cada robot y detener_servidor. Cada robot cae siempre en
+    el mismo shard, así que robots distintos casi nunca compiten por un lock.
+    Las lecturas de varias claves (items, values, instantanea) devuelven copias,
+    nunca vistas vivas, por lo que se pueden recorrer mientras otros hilos
+    conectan o desconectan robots.
+    """
+
+    def __init__(self, shards=16):
+        self._shards = [{} for _ in range(shards)]
+        self._locks = [threading.RLock() for _ in range(shards)]
+
+    def _indice(self, robot_id):
+        return hash(robot_id) % len(self._shards)
+
+    def bloqueo(self, robot_id):
+        """Lock del shard del robot, para modificar su estado sin que una instantánea lo vea a medias"""
+        return self._locks[self._indice(robot_id)]
+
+    def __getitem__(self, robot_id):
+        indice = self._indice(robot_id)
+        with self._locks[indice]:
+            return self._shards[indice][robot_id]
+
+    def __setitem__(self, robot_id, valor):
+        indice = self._indice(robot_id)
+        with self._locks[indice]:
+            self._shards[indice][robot_id] = valor
+
+    def __delitem__(self, robot_id):
+        indice = self._indice(robot_id)
+        with self._locks[indice]:
+            del self._shards[indice][robot_id]
+
+    def __contains__(self, robot_id):
+        indice = self._indice(robot_id)
+        with self._locks[indice]:
+            return robot_id in self._shards[indice]
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def get(self, robot_id, defecto=None):
+        indice = self._indice(robot_id)
+        with self._locks[indice]:
+            return self._shards[indice].get(robot_id, defecto)
+
+    def pop(self, robot_id, defecto=None):
+        indice = self._indice(robot_id)
+        with self._locks[indice]:
+            return self._shards[indice].pop(robot_id, defecto)
+
+    def items(self):
+        """Copia de los pares (robot_id, valor), tomada shard a shard"""
+        pares = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                pares.extend(shard.items())
+        return pares
+
+    def keys(self):
+        return [robot_id for robot_id, _ in self.items()]
+
+    def values(self):
+        return [valor for _, valor in self.items()]
+
+    def instantanea(self):
+        """Copia de cada estado (como dict) tomada con el lock de su shard: nunca a medio tick"""
+        copia = {}
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                for robot_id, estado in shard.items():
+                    copia[robot_id] = estado.como_dict()
+        return copia
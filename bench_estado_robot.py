@@ -0,0 +1,112 @@
+"""Compara el estado por robot como dict (formato anterior) y como EstadoRobot
+
+Mide memoria de N robots y el coste de las lecturas/escrituras que hace un
+tick, y cuántos pasos de máquina de estados por segundo salen con EstadoRobot.
+
+Uso: python bench_estado_robot.py [robots] [ticks]
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+from estado_robot import EstadoRobot
+from maquina_estados import Estado, MaquinaEstados
+from server import ServidorRobotRecolector
+
+ROBOTS = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+TICKS = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+
+def estado_dict():
+    """Estado como lo creaba inicializar_estado_robot antes de EstadoRobot"""
+    return {
+        "estado_actual": Estado.BUSCAR_OBJETO,
+        "objeto_detectado": None,
+        "tamaño_objeto": 0,
+        "tiene_objeto": False,
+        "destino_detectado": None,
+        "intentos_busqueda": 0,
+        "direccion_giro": "derecha",
+        "ultimo_comando": None,
+        "contador_movimientos": 0,
+        "velocidad_actual": None,
+        "protocolo": "json",
+        "secuencia": 0
+    }
+
+
+def memoria(fabrica):
+    """Bytes reservados por ROBOTS estados"""
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    estados = [fabrica() for _ in range(ROBOTS)]
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del estados
+    return despues - antes
+
+
+def tick_dict(estados):
+    for e in estados:
+        e["secuencia"] = 1
+        if e["estado_actual"] is Estado.BUSCAR_OBJETO and e["intentos_busqueda"] + 1 < 3:
+            e["intentos_busqueda"] += 1
+        e["objeto_detectado"] = "cuadrado"
+        e["tamaño_objeto"] = 30
+        e["ultimo_comando"] = "AVANZAR"
+        e["contador_movimientos"] += 1
+
+
+def tick_slots(estados):
+    for e in estados:
+        e.secuencia = 1
+        if e.estado_actual is Estado.BUSCAR_OBJETO and e.intentos_busqueda + 1 < 3:
+            e.intentos_busqueda += 1
+        e.objeto_detectado = "cuadrado"
+        e.tamaño_objeto = 30
+        e.ultimo_comando = "AVANZAR"
+        e.contador_movimientos += 1
+
+
+def medir_ticks(funcion, estados):
+    """Microsegundos por robot y tick"""
+    inicio = time.perf_counter()
+    for _ in range(TICKS):
+        funcion(estados)
+    return (time.perf_counter() - inicio) / (TICKS * ROBOTS) * 1e6
+
+
+def medir_maquina():
+    """Pasos completos de la máquina de estados por segundo sobre ROBOTS robots"""
+    maquina = MaquinaEstados(ServidorRobotRecolector())
+    aleatorio = random.Random(1)
+    objetos = ["", "cuadrado", "cilindro", "contenedor_cuadrado", "contenedor_cilindro"]
+    frames = [{"objeto": aleatorio.choice(objetos), "tamaño": aleatorio.randint(0, 300)}
+              for _ in range(1000)]
+    estados = [EstadoRobot() for _ in range(ROBOTS)]
+
+    inicio = time.perf_counter()
+    for tick in range(TICKS):
+        for i, estado in enumerate(estados):
+            maquina.paso(frames[(i + tick) % len(frames)], estado, i)
+    return TICKS * ROBOTS / (time.perf_counter() - inicio)
+
+
+def main():
+    mem_dict = memoria(estado_dict)
+    mem_slots = memoria(EstadoRobot)
+    us_dict = medir_ticks(tick_dict, [estado_dict() for _ in range(ROBOTS)])
+    us_slots = medir_ticks(tick_slots, [EstadoRobot() for _ in range(ROBOTS)])
+
+    print(f"📊 Estado por robot: {ROBOTS} robots, {TICKS} ticks")
+    print(f"{'':12} {'bytes/robot':>12} {'µs/tick':>8}")
+    print(f"{'dict':12} {mem_dict / ROBOTS:12.0f} {us_dict:8.3f}")
+    print(f"{'EstadoRobot':12} {mem_slots / ROBOTS:12.0f} {us_slots:8.3f}")
+    print(f"📉 Memoria: -{(1 - mem_slots / mem_dict) * 100:.0f}% | "
+          f"Tiempo por tick: -{(1 - us_slots / us_dict) * 100:.0f}%")
+    print(f"⚙️ Máquina de estados con EstadoRobot: {medir_maquina():,.0f} pasos/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compara el protocolo JSON actual con el binario: bytes por tick y tiempos de codificación
+
+Uso: python bench_protocolo.py [iteraciones]
+"""
+import json
+import sys
+import timeit
+from datetime import datetime
+
+from protocolo_binario import (
+    codificar_comando, codificar_frame, decodificar_comando, decodificar_frame
+)
+from maquina_estados import Estado
+from server import marca_tiempo_iso, plantilla_respuesta
+
+ITERACIONES = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+# Frame de cámara tal como lo envía hoy el robot y respuesta de server.py
+FRAME_JSON = {"objeto": "cuadrado", "tamaño": 12345}
+
+
+def codificar_frame_json():
+    return json.dumps(FRAME_JSON).encode("utf-8")
+
+
+def codificar_respuesta_json():
+    respuesta = {
+        "comando": "AVANZAR_LENTO",
+        "estado": Estado.IR_AL_OBJETO.value,
+        "tiene_objeto": False,
+        "timestamp": datetime.now().isoformat(),
+        "status": "ok"
+    }
+    return json.dumps(respuesta, ensure_ascii=False).encode("utf-8")
+
+
+PLANTILLA = plantilla_respuesta("AVANZAR_LENTO", Estado.IR_AL_OBJETO, False)
+
+
+def codificar_respuesta_plantilla():
+    """Lo que hace hoy server.py: plantilla precodificada + timestamp"""
+    return PLANTILLA[0] + marca_tiempo_iso() + PLANTILLA[1]
+
+
+def codificar_frame_bin():
+    return codificar_frame("cuadrado", 12345, 42)
+
+
+def codificar_respuesta_bin():
+    return codificar_comando("AVANZAR_LENTO", Estado.IR_AL_OBJETO, False, 42)
+
+
+def medir(funcion):
+    """Microsegundos por llamada"""
+    return timeit.timeit(funcion, number=ITERACIONES) / ITERACIONES * 1e6
+
+
+def main():
+    frame_json = codificar_frame_json()
+    respuesta_json = codificar_respuesta_json()
+    frame_bin = codificar_frame_bin()
+    respuesta_bin = codificar_respuesta_bin()
+
+    filas = [
+        ("JSON", len(frame_json), len(respuesta_json),
+         medir(codificar_frame_json), medir(lambda: json.loads(frame_json)),
+         medir(codificar_respuesta_json), medir(lambda: json.loads(respuesta_json))),
+        ("JSON+pl.", len(frame_json), len(codificar_respuesta_plantilla()),
+         medir(codificar_frame_json), medir(lambda: json.loads(frame_json)),
+         medir(codificar_respuesta_plantilla), medir(lambda: json.loads(respuesta_json))),
+        ("Binario", len(frame_bin), len(respuesta_bin),
+         medir(codificar_frame_bin), medir(lambda: decodificar_frame(frame_bin)),
+         medir(codificar_respuesta_bin), medir(lambda: decodificar_comando(respuesta_bin))),
+    ]
+
+    print(f"📊 Protocolo de cámara/comandos ({ITERACIONES} iteraciones, µs por operación)")
+    print(f"{'':8} {'B frame':>8} {'B cmd':>6} {'B/tick':>7} "
+          f"{'enc frame':>10} {'dec frame':>10} {'enc cmd':>8} {'dec cmd':>8}")
+    for nombre, b_frame, b_cmd, e_frame, d_frame, e_cmd, d_cmd in filas:
+        print(f"{nombre:8} {b_frame:8d} {b_cmd:6d} {b_frame + b_cmd:7d} "
+              f"{e_frame:10.2f} {d_frame:10.2f} {e_cmd:8.2f} {d_cmd:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Compara la recepción con recv() + bytes contra recv_into sobre el bloque preasignado
+
+Mide, por frame recibido y separado en tramas, la memoria transitoria
+(pico de tracemalloc por encima de la memoria viva) y el tiempo.
+
+Uso: python bench_recepcion.py [frames]
+"""
+import json
+import socket
+import sys
+import time
+import tracemalloc
+
+from protocolo_binario import FRAME, codificar_frame
+from tramas import DecodificadorTramas
+
+FRAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+FRAME_JSON = json.dumps({"objeto": "cuadrado", "tamaño": 12345}).encode("utf-8")
+FRAME_BIN = codificar_frame("cuadrado", 12345, 42)
+
+
+def recibir_con_recv(conexion, decodificador):
+    """Camino anterior: un bytes nuevo por recv y una copia bytes por trama"""
+    trama = decodificador.siguiente()
+    while trama is None:
+        decodificador.alimentar(conexion.recv(4096))
+        trama = decodificador.siguiente()
+    return bytes(trama)
+
+
+def recibir_con_recv_into(conexion, decodificador):
+    """Camino actual de server.py/serverz.py"""
+    trama = decodificador.siguiente()
+    while trama is None:
+        decodificador.recibir_desde(conexion)
+        trama = decodificador.siguiente()
+    return trama
+
+
+def medir(recibir, modo, frame, registro=0):
+    """(bytes transitorios por frame, µs por frame)"""
+    emisor, receptor = socket.socketpair()
+    decodificador = DecodificadorTramas(modo, tamaño_registro=registro)
+    try:
+        # Calentamiento: que el buffer del decodificador alcance su tamaño estable
+        for _ in range(100):
+            emisor.sendall(frame)
+            recibir(receptor, decodificador)
+
+        tracemalloc.start()
+        transitorio = 0
+        for _ in range(FRAMES):
+            emisor.sendall(frame)
+            tracemalloc.reset_peak()
+            actual, _ = tracemalloc.get_traced_memory()
+            recibir(receptor, decodificador)
+            _, pico = tracemalloc.get_traced_memory()
+            transitorio += pico - actual
+        tracemalloc.stop()
+
+        inicio = time.perf_counter()
+        for _ in range(FRAMES):
+            emisor.sendall(frame)
+            recibir(receptor, decodificador)
+        segundos = time.perf_counter() - inicio
+    finally:
+        emisor.close()
+        receptor.close()
+    return transitorio / FRAMES, segundos / FRAMES * 1e6
+
+
+def main():
+    print(f"📊 Recepción de frames ({FRAMES} frames, socketpair local)")
+    print(f"{'':10} {'camino':10} {'B transitorios/frame':>21} {'µs/frame':>9}")
+    for nombre, modo, frame, registro in (("JSON", "json", FRAME_JSON, 0),
+                                          ("Binario", "fijo", FRAME_BIN, FRAME.size)):
+        for camino, recibir in (("recv", recibir_con_recv), ("recv_into", recibir_con_recv_into)):
+            transitorio, micros = medir(recibir, modo, frame, registro)
+            print(f"{nombre:10} {camino:10} {transitorio:21.0f} {micros:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
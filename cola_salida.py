@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import deque
+
+from metricas import Histograma
+
+# Mensajes pendientes por robot; los que llegan con la cola llena se descartan
+MAXIMO_MENSAJES = 32
+# Segundos que puede esperar el mensaje más antiguo sin entregar antes de
+# considerar que el robot no da abasto
+ESPERA_MAXIMA = 2.0
+
+
+class ColaSalida:
+    """Cola de salida acotada de un robot
+
+    La consola solo encola (O(1), nunca bloquea en la red); el bucle de E/S
+    la vacía cuando el socket admite escritura y mide la latencia desde que se
+    encoló hasta que se entregó al socket. Si la cola se llena, encolar()
+    descarta el mensaje y devuelve False: una ráfaga de la consola no dice nada
+    del robot. Que el robot no da abasto se decide por la antigüedad del
+    mensaje más antiguo sin entregar (mas_antiguo()).
+    """
+
+    def __init__(self, maximo=MAXIMO_MENSAJES):
+        self.maximo = maximo
+        self.mensajes = deque()
+        self.lock = threading.Lock()
+        self.cerrada = False
+        self.encolados = 0
+        self.entregados = 0
+        self.descartados = 0
+        self.latencia = Histograma()
+
+    def __len__(self):
+        return len(self.mensajes)
+
+    def encolar(self, datos):
+        """Añade un mensaje; False si la cola está cerrada o llena"""
+        with self.lock:
+            if self.cerrada:
+                return False
+            if len(self.mensajes) >= self.maximo:
+                self.descartados += 1
+                return False
+            self.mensajes.append((datos, time.perf_counter()))
+            self.encolados += 1
+            return True
+
+    def tomar(self):
+        """Saca el próximo mensaje sin esperar: (datos, instante_encolado), o None"""
+        with self.lock:
+            if self.cerrada or not self.mensajes:
+                return None
+            return self.mensajes.popleft()
+
+    def mas_antiguo(self):
+        """Instante de encolado del mensaje pendiente más antiguo (None si no hay)"""
+        with self.lock:
+            return self.mensajes[0][1] if self.mensajes else None
+
+    def entregado(self, instante_encolado):
+        """Registra la entrega de un mensaje; devuelve su latencia en segundos"""
+        latencia = time.perf_counter() - instante_encolado
+        self.latencia.observar(latencia)
+        self.entregados += 1
+        return latencia
+
+    def cerrar(self):
+        with self.lock:
+            self.cerrada = True
+            self.mensajes.clear()
+
+    def resumen(self):
+        return {
+            "pendientes": len(self.mensajes),
+            "encolados": self.encolados,
+            "entregados": self.entregados,
+            "descartados": self.descartados,
+            "latencia": self.latencia.resumen(),
+        }
@@ -1,18 +1,24 @@
-import socket
 import json
-import time
-from datetime import datetime
+import sys
 import random
 
+import transporte
+from reloj import RelojReal, reloj_desde_argv
+
 class EscenarioCompleto:
-    def __init__(self, host='localhost', port=8888):
+    def __init__(self, host='localhost', port=8888, reloj=None, direccion=None):
         self.host = host
         self.port = port
+        # Transporte: None = tcp://host:port; también unix:///ruta o memoria://nombre
+        self.direccion = direccion or f"tcp://{host}:{port}"
         self.socket = None
         self.robot_id = "ROBOT_SIM_001"
         self.estado_actual = "buscar_objeto"
         self.tiene_objeto = False
         self.contador_movimientos = 0
+
+        # Reloj de la simulación (RelojVirtual para correr sin esperas en pruebas)
+        self.reloj = reloj or RelojReal()
         
         # Configuración de simulación
         self.objetos_validos = ["pelota", "cuadrado", "triangulo", "caja"]
@@ -28,9 +34,8 @@ class EscenarioCompleto:
     def conectar_servidor(self):
         """Establece conexión con el servidor"""
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.connect((self.host, self.port))
-            print(f"✅ [{self.robot_id}] Conectado al servidor en {self.host}:{self.port}")
+            self.socket = transporte.conectar(self.direccion)
+            print(f"✅ [{self.robot_id}] Conectado al servidor en {self.direccion}")
             return True
         except Exception as e:
             print(f"❌ [{self.robot_id}] Error de conexión: {e}")
@@ -43,7 +48,7 @@ class EscenarioCompleto:
             datos_completos = {
                 **datos,
                 "robot_id": self.robot_id,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self.reloj.fecha().isoformat(),
                 "bateria": random.randint(20, 100)
             }
             
@@ -71,7 +76,7 @@ class EscenarioCompleto:
             return
             
         print("\n" + "="*50)
-        print(f"📥 RESPUESTA DEL SERVIDOR [{datetime.now().strftime('%H:%M:%S')}]")
+        print(f"📥 RESPUESTA DEL SERVIDOR [{self.reloj.fecha().strftime('%H:%M:%S')}]")
         print(f"🔄 Estado actual: {respuesta.get('estado', 'desconocido').upper()}")
         print(f"📌 Comando recibido: {respuesta.get('comando', 'NINGUNO')}")
         print(f"📦 Tiene objeto: {'✅' if respuesta.get('tiene_objeto', False) else '❌'}")
@@ -223,13 +228,16 @@ class EscenarioCompleto:
                 print("⚠️ No se recibió respuesta válida, terminando escenario")
                 break
                 
-            time.sleep(paso["delay"])
+            self.reloj.dormir(paso["delay"])
         
         print("\n🎉 Escenario completado!")
         self.socket.close()
 
 if __name__ == "__main__":
-    simulador = EscenarioCompleto()
+    # --virtual: sin esperas reales; --escala=N: N veces más rápido
+    # --transporte=unix:///tmp/robot.sock: conecta por otro transporte
+    direccion = next((a.split("=", 1)[1] for a in sys.argv[1:] if a.startswith("--transporte=")), None)
+    simulador = EscenarioCompleto(reloj=reloj_desde_argv(sys.argv), direccion=direccion)
     
     print("🤖 SIMULADOR DE ROBOT RECOLECTOR")
     print("1. Escenario éxito normal")
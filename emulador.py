@@ -1,18 +1,26 @@
 import socket
 import json
-import time
 import random
 import threading
-from datetime import datetime
+import sys
+
+import transporte
+from reloj import RelojReal, reloj_desde_argv
 
 class ESP32RobotEmulator:
-    def __init__(self, server_ip='192.168.100.92', server_port=8888, robot_name="ESP32-Emulador"):
+    def __init__(self, server_ip='192.168.100.92', server_port=8888, robot_name="ESP32-Emulador", reloj=None,
+                 direccion=None):
         self.server_ip = server_ip
         self.server_port = server_port
+        # Transporte: None = tcp://ip:puerto; también unix:///ruta o memoria://nombre
+        self.direccion = direccion or f"tcp://{server_ip}:{server_port}"
         self.robot_name = robot_name
         self.socket = None
         self.connected = False
         self.running = False
+
+        # Reloj de la simulación (RelojVirtual para correr sin esperas en pruebas)
+        self.reloj = reloj or RelojReal()
         
         # Simulación de detecciones posibles
         self.possible_detections = [
@@ -50,15 +58,13 @@ class ESP32RobotEmulator:
         """Conecta al servidor de visión robótica"""
         try:
             print("🔌 Intentando conectar al servidor...")
-            print(f"📡 Servidor: {self.server_ip}:{self.server_port}")
+            print(f"📡 Servidor: {self.direccion}")
             
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.settimeout(10)  # Timeout de 10 segundos
-            self.socket.connect((self.server_ip, self.server_port))
+            self.socket = transporte.conectar(self.direccion, timeout=10)  # Timeout de 10 segundos
             
             self.connected = True
             print(f"✅ Conectado exitosamente como {self.robot_name}")
-            print(f"🕐 Hora de conexión: {datetime.now().strftime('%H:%M:%S')}")
+            print(f"🕐 Hora de conexión: {self.reloj.fecha().strftime('%H:%M:%S')}")
             return True
             
         except socket.timeout:
@@ -79,7 +85,7 @@ class ESP32RobotEmulator:
                 
             # Agregar información adicional
             detection_data["robot_id"] = self.robot_name
-            detection_data["timestamp"] = datetime.now().isoformat()
+            detection_data["timestamp"] = self.reloj.fecha().isoformat()
             
             message = json.dumps(detection_data)
             self.socket.send(message.encode('utf-8'))
@@ -145,7 +151,7 @@ class ESP32RobotEmulator:
         # Simular tiempo de ejecución del comando
         execution_time = random.uniform(0.5, 1.5)
         print(f"⚙️ Ejecutando comando... ({execution_time:.1f}s)")
-        time.sleep(execution_time)
+        self.reloj.dormir(execution_time)
         print("✅ Comando ejecutado")
     
     # def get_next_detection(self):
@@ -262,7 +268,7 @@ class ESP32RobotEmulator:
             
         self.running = True
         detection_count = 0
-        start_time = time.time()
+        start_time = self.reloj.ahora()
         
         # Velocidad de simulación (segundos entre detecciones)
         simulation_speed = 2.0
@@ -291,12 +297,12 @@ class ESP32RobotEmulator:
                         break
                 else:
                     print("❌ Error enviando detección, reintentando...")
-                    time.sleep(1)
+                    self.reloj.dormir(1)
                     continue
                 
                 # Pausa entre detecciones
                 if self.current_mode != 3:  # No pausar en modo interactivo
-                    time.sleep(simulation_speed)
+                    self.reloj.dormir(simulation_speed)
                 
                 print("-" * 30)
                 
@@ -369,7 +375,7 @@ class ESP32RobotEmulator:
     
     def show_stats(self, detection_count, start_time):
         """Muestra estadísticas de la emulación"""
-        elapsed_time = time.time() - start_time
+        elapsed_time = self.reloj.ahora() - start_time
         print(f"\n📊 ESTADÍSTICAS:")
         print(f"⏱️ Tiempo transcurrido: {elapsed_time:.1f}s")
         print(f"📤 Detecciones enviadas: {detection_count}")
@@ -404,7 +410,10 @@ def main():
     print(f"🤖 Nombre del robot: {robot_name}")
     
     # Crear y ejecutar emulador
-    emulator = ESP32RobotEmulator(server_ip, server_port, robot_name)
+    # --virtual: sin esperas reales; --escala=N: N veces más rápido
+    # --transporte=unix:///tmp/robot.sock: conecta por otro transporte
+    direccion = next((a.split("=", 1)[1] for a in sys.argv[1:] if a.startswith("--transporte=")), None)
+    emulator = ESP32RobotEmulator(server_ip, server_port, robot_name, reloj_desde_argv(sys.argv), direccion)
     
     try:
         emulator.run_emulation()
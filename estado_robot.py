@@ -0,0 +1,90 @@
+import time
+
+from maquina_estados import Estado
+
+# Comandos que fijan un estado continuo de los motores o de la pinza
+COMANDOS_MOVIMIENTO = frozenset({"AVANZAR", "RETROCEDER", "IZQUIERDA", "DERECHA", "PARAR"})
+COMANDOS_PINZA = frozenset({"AGARRAR", "SOLTAR"})
+
+
+class SombraActuadores:
+    """Copia del último estado de actuadores enviado al robot
+
+    Con el envío por diferencias solo se transmite lo que no coincide con esta
+    copia; cada cierto tiempo se reenvía movimiento y velocidades por si el
+    robot perdió un comando (ultimo_refresco).
+    """
+
+    __slots__ = ("movimiento", "velocidad_derecha", "velocidad_izquierda", "pinza", "ultimo_refresco")
+
+    def __init__(self):
+        self.movimiento = None
+        self.velocidad_derecha = None
+        self.velocidad_izquierda = None
+        self.pinza = None
+        self.ultimo_refresco = time.monotonic()
+
+    def cambia(self, comando):
+        """True si el comando altera los actuadores (los comandos sin estado siempre cambian)"""
+        if comando in COMANDOS_MOVIMIENTO:
+            return comando != self.movimiento
+        if comando in COMANDOS_PINZA:
+            return comando != self.pinza
+        return True
+
+    def registrar(self, comando):
+        """Anota un comando ya enviado"""
+        if comando in COMANDOS_MOVIMIENTO:
+            self.movimiento = comando
+        elif comando in COMANDOS_PINZA:
+            self.pinza = comando
+
+    def refresco_pendiente(self, ahora, intervalo):
+        return ahora - self.ultimo_refresco >= intervalo
+
+    def como_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+
+class EstadoRobot:
+    """Estado de control de un robot (antes un dict de ~12 claves por robot)"""
+
+    __slots__ = (
+        "estado_actual",
+        "objeto_detectado",
+        "tamaño_objeto",
+        "tiene_objeto",
+        "destino_detectado",
+        "intentos_busqueda",
+        "direccion_giro",
+        "ultimo_comando",
+        "contador_movimientos",
+        "velocidad_actual",
+        "protocolo",
+        "secuencia",
+        "actuadores",
+    )
+
+    def __init__(self):
+        self.estado_actual = Estado.BUSCAR_OBJETO
+        self.objeto_detectado = None
+        self.tamaño_objeto = 0
+        self.tiene_objeto = False
+        self.destino_detectado = None
+        self.intentos_busqueda = 0
+        self.direccion_giro = "derecha"
+        self.ultimo_comando = None
+        self.contador_movimientos = 0
+        self.velocidad_actual = None
+        self.protocolo = "json"
+        self.secuencia = 0
+        self.actuadores = SombraActuadores()
+
+    def como_dict(self):
+        """Copia en forma de diccionario (para instantáneas y depuración)"""
+        copia = {campo: getattr(self, campo) for campo in self.__slots__}
+        copia["actuadores"] = self.actuadores.como_dict()
+        return copia
+
+    def __repr__(self):
+        return f"EstadoRobot({self.estado_actual.name}, tiene_objeto={self.tiene_objeto})"
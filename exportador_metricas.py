@@ -0,0 +1,169 @@
+"""Endpoint HTTP /metrics en el formato de texto de Prometheus (solo biblioteca estándar)
+
+El scrape lee los contadores que los servidores ya mantienen: no toma ningún
+lock del bucle de control salvo los breves de MetricasServidor y de los shards
+de estados para tomar la instantánea, y todo el formateo ocurre en el hilo HTTP.
+
+Uso: python server.py --metricas-http=9108   (también serverz.py y serverm.py)
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from metricas import LIMITES_CUBETAS, MetricasRobot
+from registro import log
+
+TIPO_CONTENIDO = "text/plain; version=0.0.4; charset=utf-8"
+PUERTO_METRICAS = 9108
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(etiquetas):
+    if not etiquetas:
+        return ""
+    return "{" + ",".join(f'{clave}="{_escapar(valor)}"' for clave, valor in etiquetas.items()) + "}"
+
+
+class TextoPrometheus:
+    """Acumula familias de métricas en el formato de exposición de texto"""
+
+    def __init__(self):
+        self.lineas = []
+
+    def familia(self, nombre, tipo, ayuda):
+        self.lineas.append(f"# HELP {nombre} {ayuda}")
+        self.lineas.append(f"# TYPE {nombre} {tipo}")
+
+    def muestra(self, nombre, valor, **etiquetas):
+        self.lineas.append(f"{nombre}{_etiquetas(etiquetas)} {valor}")
+
+    def histograma(self, nombre, histograma, **etiquetas):
+        """Vuelca un metricas.Histograma como histograma de Prometheus (segundos)"""
+        acumulado = 0
+        # La última cubeta recoge también los valores fuera de rango: va en +Inf
+        for limite, cuenta in zip(LIMITES_CUBETAS[:-1], histograma.cuentas):
+            acumulado += cuenta
+            self.muestra(f"{nombre}_bucket", acumulado, **etiquetas, le=f"{limite:.6g}")
+        self.muestra(f"{nombre}_bucket", histograma.total, **etiquetas, le="+Inf")
+        self.muestra(f"{nombre}_sum", histograma.suma, **etiquetas)
+        self.muestra(f"{nombre}_count", histograma.total, **etiquetas)
+
+    def texto(self):
+        return "\n".join(self.lineas) + "\n"
+
+
+def metricas_agregadas(texto, agregado):
+    """Contadores y tiempos por fase de un MetricasRobot (agregado de varios robots)"""
+    for nombre, valor, ayuda in (
+        ("robot_frames_total", agregado.frames, "Frames de cámara procesados"),
+        ("robot_frames_descartados_total", agregado.frames_descartados,
+         "Frames reemplazados por uno más reciente antes de decidir"),
+        ("robot_comandos_omitidos_total", agregado.comandos_omitidos,
+         "Comandos no enviados porque no cambiaban los actuadores"),
+        ("robot_bytes_recibidos_total", agregado.bytes_entrada, "Bytes recibidos de los robots"),
+        ("robot_bytes_enviados_total", agregado.bytes_salida, "Bytes enviados a los robots"),
+    ):
+        texto.familia(nombre, "counter", ayuda)
+        texto.muestra(nombre, valor)
+
+    texto.familia("robot_comandos_total", "counter", "Comandos decididos por tipo")
+    for comando, cuenta in sorted(agregado.comandos.items()):
+        texto.muestra("robot_comandos_total", cuenta, comando=comando)
+
+    texto.familia("robot_retraso_tick_segundos", "histogram",
+                  "Cuánto se pasaron de su deadline los ticks que no cumplieron el periodo")
+    texto.histograma("robot_retraso_tick_segundos", agregado.retraso)
+
+    texto.familia("robot_fase_segundos", "histogram", "Duración de cada fase del tick")
+    for fase in MetricasRobot.FASES:
+        texto.histograma("robot_fase_segundos", getattr(agregado, fase), fase=fase)
+
+
+def ocupacion_estados(estados_robot):
+    """Robots por estado, sobre la instantánea del almacén (nunca un estado a medio tick)"""
+    ocupacion = {}
+    for estado in estados_robot.instantanea().values():
+        nombre = estado["estado_actual"].value
+        ocupacion[nombre] = ocupacion.get(nombre, 0) + 1
+    return ocupacion
+
+
+def metricas_sesiones(texto, conectados, ocupacion, conexiones):
+    """Robots conectados, robots por estado y contadores de MetricasServidor.conexiones()"""
+    texto.familia("robot_robots_conectados", "gauge", "Robots con sesión abierta")
+    texto.muestra("robot_robots_conectados", conectados)
+
+    texto.familia("robot_estado_robots", "gauge", "Robots en cada estado de la máquina")
+    for nombre, cuenta in sorted(ocupacion.items()):
+        texto.muestra("robot_estado_robots", cuenta, estado=nombre)
+
+    for nombre, clave, ayuda in (
+        ("robot_conexiones_aceptadas_total", "aceptadas", "Conexiones admitidas"),
+        ("robot_conexiones_rechazadas_total", "rechazadas", "Conexiones rechazadas por el límite de sesiones"),
+        ("robot_reconexiones_total", "reconexiones",
+         "Sesiones de un robot (robot_id de sus frames) que había cerrado sesión hace menos de 5 min"),
+    ):
+        texto.familia(nombre, "counter", ayuda)
+        texto.muestra(nombre, conexiones[clave])
+
+
+def metricas_servidor(servidor):
+    """Texto de /metrics para server.py y serverz.py"""
+    texto = TextoPrometheus()
+    metricas = servidor.metricas
+    metricas_sesiones(texto, len(metricas.robots), ocupacion_estados(servidor.estados_robot), metricas.conexiones())
+    metricas_agregadas(texto, metricas.agregado())
+    return texto.texto()
+
+
+class ExportadorMetricas:
+    """Servidor HTTP en un hilo propio que responde /metrics con generar()"""
+
+    def __init__(self, generar, host="0.0.0.0", puerto=PUERTO_METRICAS):
+        self.generar = generar
+        self.host = host
+        self.puerto = puerto
+        self.httpd = None
+
+    def iniciar(self):
+        generar = self.generar
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                cuerpo = generar().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", TIPO_CONTENIDO)
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, formato, *args):
+                pass  # un scrape cada pocos segundos no debe llenar el registro
+
+        self.httpd = ThreadingHTTPServer((self.host, self.puerto), Manejador)
+        self.httpd.daemon_threads = True
+        hilo = threading.Thread(target=self.httpd.serve_forever, name="metricas-http", daemon=True)
+        hilo.start()
+        log.info("📈 Métricas Prometheus en http://%s:%s/metrics", self.host, self.puerto)
+        return self
+
+    def soltar_heredado(self):
+        """En un proceso hijo creado con fork: cierra la copia del socket de escucha
+
+        El hilo HTTP no existe en el hijo, así que no hay que pararlo; solo
+        liberar el descriptor para que el hijo no mantenga abierto el puerto.
+        """
+        if self.httpd is not None:
+            self.httpd.socket.close()
+            self.httpd = None
+
+    def detener(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
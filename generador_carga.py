@@ -0,0 +1,219 @@
+"""Generador de carga: N robots simulados contra ServidorRobotRecolector
+
+Cada robot abre su conexión, envía frames de cámara a la frecuencia pedida y
+mide la latencia frame -> comando en un metricas.Histograma (memoria fija por
+robot, sin listas de muestras). Al final se informa el throughput y los
+percentiles p50/p95/p99 (límite superior de la cubeta, resolución √2).
+
+Un frame sin respuesta en --espera-respuesta segundos se cuenta como
+respuesta omitida y el robot sigue con el siguiente: serverz.py --solo-cambios
+no contesta cuando el comando no cambia los actuadores. Contra ese modo
+conviene una espera cercana al periodo (1 / --hz).
+
+Ejemplos:
+    python generador_carga.py --robots 500 --hz 10 --duracion 30
+    python generador_carga.py --robots 4000 --procesos 4 --hz 0 --binario
+    python generador_carga.py --robots 200 --hz 10 --espera-respuesta 0.15   # serverz.py --solo-cambios
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import time
+
+from metricas import Histograma
+from protocolo_binario import (
+    COMANDO, RESPUESTA_SALUDO, SALUDO_BINARIO, codificar_frame, decodificar_comando
+)
+from tramas import DecodificadorTramas
+
+OBJETOS_SIMULADOS = ["", "cuadrado", "cilindro", "contenedor_cuadrado", "contenedor_cilindro", "nada"]
+
+
+def generar_frame(aleatorio):
+    """Frame de cámara aleatorio (objeto, tamaño)"""
+    objeto = aleatorio.choice(OBJETOS_SIMULADOS)
+    tamaño = aleatorio.randint(0, 40000) if objeto else 0
+    return objeto, tamaño
+
+
+def es_comando_de_velocidad(trama, binario):
+    """Las velocidades de serverz.py llegan antes del comando de movimiento"""
+    if binario:
+        return decodificar_comando(trama)["comando"].startswith("VELOCIDAD")
+    return trama.startswith(b"VELOCIDAD")
+
+
+class RobotSimulado:
+    """Un robot que envía frames y espera el comando de cada uno"""
+
+    def __init__(self, host, port, frecuencia_hz, binario, semilla, espera_respuesta):
+        self.host = host
+        self.port = port
+        self.periodo = 1.0 / frecuencia_hz if frecuencia_hz else 0.0
+        self.binario = binario
+        self.aleatorio = random.Random(semilla)
+        self.espera_respuesta = espera_respuesta
+        self.latencias = Histograma()
+        self.errores = 0
+        # Frames que no recibieron comando dentro de espera_respuesta
+        self.omitidas = 0
+
+    async def recibir_respuesta(self, reader, decodificador):
+        """Espera hasta el comando de movimiento (saltando los de velocidad)"""
+        while True:
+            trama = decodificador.siguiente()
+            while trama is None:
+                data = await reader.read(4096)
+                if not data:
+                    return None
+                decodificador.alimentar(data)
+                trama = decodificador.siguiente()
+            if not es_comando_de_velocidad(trama, self.binario):
+                return trama
+
+    async def ejecutar(self, fin):
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        except OSError:
+            self.errores += 1
+            return
+
+        decodificador = DecodificadorTramas("json")
+        try:
+            if self.binario:
+                writer.write(SALUDO_BINARIO + b"\n")
+                respuesta = await reader.readexactly(len(RESPUESTA_SALUDO))
+                if respuesta != RESPUESTA_SALUDO:
+                    self.errores += 1
+                    return
+                decodificador.cambiar_modo("fijo", COMANDO.size)
+
+            secuencia = 0
+            proximo = time.monotonic()
+            while time.monotonic() < fin:
+                objeto, tamaño = generar_frame(self.aleatorio)
+                secuencia += 1
+                if self.binario:
+                    mensaje = codificar_frame(objeto, tamaño, secuencia)
+                else:
+                    mensaje = json.dumps({"objeto": objeto, "tamaño": tamaño}).encode("utf-8")
+
+                inicio = time.perf_counter()
+                writer.write(mensaje)
+                restante = fin - time.monotonic()
+                try:
+                    respuesta = await asyncio.wait_for(
+                        self.recibir_respuesta(reader, decodificador), min(self.espera_respuesta, restante)
+                    )
+                except asyncio.TimeoutError:
+                    # Si solo se acabó la prueba no es una omisión del servidor
+                    if restante > self.espera_respuesta:
+                        self.omitidas += 1
+                else:
+                    if respuesta is None:
+                        self.errores += 1
+                        return
+                    self.latencias.observar(time.perf_counter() - inicio)
+
+                if self.periodo:
+                    proximo += self.periodo
+                    espera = proximo - time.monotonic()
+                    if espera > 0:
+                        await asyncio.sleep(espera)
+                    else:
+                        proximo = time.monotonic()
+        except (OSError, asyncio.IncompleteReadError):
+            self.errores += 1
+        finally:
+            writer.close()
+
+
+async def _ejecutar_flota(host, port, robots, frecuencia_hz, duracion, binario, semilla, escalonado,
+                          espera_respuesta):
+    fin = time.monotonic() + duracion
+    flota = [RobotSimulado(host, port, frecuencia_hz, binario, semilla + i, espera_respuesta)
+             for i in range(robots)]
+
+    tareas = []
+    for robot in flota:
+        tareas.append(asyncio.create_task(robot.ejecutar(fin)))
+        if escalonado:
+            await asyncio.sleep(escalonado)
+    await asyncio.gather(*tareas)
+
+    latencias = Histograma()
+    for robot in flota:
+        latencias.fusionar(robot.latencias)
+    return latencias, sum(robot.errores for robot in flota), sum(robot.omitidas for robot in flota)
+
+
+def ejecutar_flota(args):
+    """Punto de entrada de cada proceso: devuelve (latencias, errores, omitidas)"""
+    return asyncio.run(_ejecutar_flota(*args))
+
+
+def mostrar_informe(latencias, errores, omitidas, robots, duracion_real):
+    total = latencias.total
+    print("=" * 60)
+    print("📊 RESULTADOS DE CARGA")
+    print("=" * 60)
+    print(f"🤖 Robots: {robots} | ❌ Errores: {errores}")
+    print(f"📤 Comandos recibidos: {total} en {duracion_real:.1f}s")
+    if omitidas:
+        print(f"🔇 Frames sin respuesta (omitidas o más lentas que --espera-respuesta): {omitidas}")
+    print(f"📈 Throughput: {total / duracion_real:.1f} comandos/s")
+    if total:
+        print("⏱️ Latencia frame → comando (ms): "
+              f"p50={latencias.percentil(50) * 1000:.2f} "
+              f"p95={latencias.percentil(95) * 1000:.2f} "
+              f"p99={latencias.percentil(99) * 1000:.2f} "
+              f"max={latencias.maximo * 1000:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga para ServidorRobotRecolector")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1234)
+    parser.add_argument("--robots", type=int, default=100, help="robots simulados en total")
+    parser.add_argument("--procesos", type=int, default=1, help="procesos entre los que repartir los robots")
+    parser.add_argument("--hz", type=float, default=10.0, help="frames por segundo por robot (0 = sin pausa)")
+    parser.add_argument("--duracion", type=float, default=10.0, help="segundos de prueba")
+    parser.add_argument("--binario", action="store_true", help="negociar el protocolo binario")
+    parser.add_argument("--escalonado", type=float, default=0.0, help="segundos entre conexiones")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--espera-respuesta", type=float, default=1.0,
+                        help="segundos a esperar el comando de un frame antes de darlo por omitido")
+    args = parser.parse_args()
+
+    procesos = max(1, min(args.procesos, args.robots))
+    reparto = [args.robots // procesos + (1 if i < args.robots % procesos else 0) for i in range(procesos)]
+    trabajos = [
+        (args.host, args.port, n, args.hz, args.duracion, args.binario,
+         args.semilla + i * 100000, args.escalonado, args.espera_respuesta)
+        for i, n in enumerate(reparto)
+    ]
+
+    print(f"🚀 {args.robots} robots en {procesos} proceso(s) → {args.host}:{args.port} "
+          f"a {args.hz} Hz durante {args.duracion}s")
+    inicio = time.monotonic()
+    if procesos == 1:
+        resultados = [ejecutar_flota(trabajos[0])]
+    else:
+        with multiprocessing.Pool(procesos) as pool:
+            resultados = pool.map(ejecutar_flota, trabajos)
+    duracion_real = time.monotonic() - inicio
+
+    latencias = Histograma()
+    errores = 0
+    omitidas = 0
+    for lat, err, omi in resultados:
+        latencias.fusionar(lat)
+        errores += err
+        omitidas += omi
+    mostrar_informe(latencias, errores, omitidas, args.robots, duracion_real)
+
+
+if __name__ == "__main__":
+    main()
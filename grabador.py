@@ -0,0 +1,191 @@
+"""Grabación de sesiones: frames de cámara y comandos de cada robot en un log binario
+
+Formato (append-only, big-endian). Cada archivo empieza con MAGIA y sigue con
+registros CABECERA + carga:
+
+    tipo       ROBOT: asigna un índice a un robot_id (carga = robot_id en utf-8)
+               INICIO: el robot empieza sesión (estado inicial)
+               FRAME: datos de cámara (carga = FRAME_CARGA + objeto en utf-8)
+               COMANDO: comando decidido (carga = comando en utf-8)
+               ESTADO: estado de control de un robot que ya estaba en marcha
+                       al abrirse el archivo (carga = CAMPOS_ESTADO en JSON)
+    robot      índice del robot dentro del archivo
+    instante   time.time() del evento
+    longitud   bytes de la carga
+
+Los índices de robot se declaran de nuevo en cada archivo y, si el robot no
+empieza sesión en él, van seguidos de su ESTADO; así cualquier archivo rotado
+se puede reproducir por sí solo. El frame se graba antes de decidir, de modo
+que ese ESTADO es siempre el que tenía el robot justo antes de su primer frame
+en el archivo.
+"""
+import json
+import os
+import struct
+import threading
+import time
+
+from estado_robot import EstadoRobot
+from maquina_estados import Estado
+
+MAGIA = b"RBLOG1\n"
+CABECERA = struct.Struct("!BHdH")
+FRAME_CARGA = struct.Struct("!dI")
+
+ROBOT = 0
+INICIO = 1
+FRAME = 2
+COMANDO = 3
+ESTADO = 4
+
+# Campos de EstadoRobot que se guardan en ESTADO (la sombra de actuadores no
+# interviene en la decisión)
+CAMPOS_ESTADO = tuple(campo for campo in EstadoRobot.__slots__ if campo != "actuadores")
+
+TAMAÑO_ROTACION = 64 * 1024 * 1024
+# El índice de robot es un uint16 en la cabecera
+MAXIMO_ROBOTS_ARCHIVO = 0xFFFF
+
+
+class GrabadorSesiones:
+    """Escribe los eventos de todos los robots en archivos .rblog rotados por tamaño"""
+
+    def __init__(self, directorio, tamaño_rotacion=TAMAÑO_ROTACION, prefijo="sesiones", estados=None):
+        self.directorio = directorio
+        self.tamaño_rotacion = tamaño_rotacion
+        self.prefijo = prefijo
+        # robot_id -> EstadoRobot del servidor, para los registros ESTADO
+        self.estados = estados
+        self._lock = threading.Lock()
+        self._archivo = None
+        self._escritos = 0
+        self._indices = {}
+        self._secuencia_archivo = 0
+        os.makedirs(directorio, exist_ok=True)
+
+    def _abrir(self):
+        self._secuencia_archivo += 1
+        # El pid separa los archivos de cada worker cuando hay varios procesos
+        nombre = (f"{self.prefijo}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+                  f"-{self._secuencia_archivo:04d}.rblog")
+        self._archivo = open(os.path.join(self.directorio, nombre), "ab")
+        self._archivo.write(MAGIA)
+        self._escritos = len(MAGIA)
+        self._indices = {}
+
+    def _escribir(self, tipo, robot_id, carga=b""):
+        # Llamar con el lock tomado
+        if (self._archivo is None or self._escritos >= self.tamaño_rotacion
+                or len(self._indices) >= MAXIMO_ROBOTS_ARCHIVO):
+            self.cerrar_archivo()
+            self._abrir()
+
+        indice = self._indices.get(robot_id)
+        if indice is None:
+            indice = self._indices[robot_id] = len(self._indices)
+            nombre = str(robot_id).encode("utf-8")
+            self._archivo.write(CABECERA.pack(ROBOT, indice, time.time(), len(nombre)) + nombre)
+            self._escritos += CABECERA.size + len(nombre)
+            if tipo != INICIO:
+                self._escribir_estado(indice, robot_id)
+
+        self._archivo.write(CABECERA.pack(tipo, indice, time.time(), len(carga)) + carga)
+        self._escritos += CABECERA.size + len(carga)
+
+    def _escribir_estado(self, indice, robot_id):
+        # Solo lo llama el hilo del propio robot: su estado no cambia mientras tanto
+        estado = self.estados.get(robot_id) if self.estados is not None else None
+        if estado is None:
+            return
+        campos = {campo: getattr(estado, campo) for campo in CAMPOS_ESTADO}
+        campos["estado_actual"] = estado.estado_actual.value
+        carga = json.dumps(campos, ensure_ascii=False).encode("utf-8")
+        self._archivo.write(CABECERA.pack(ESTADO, indice, time.time(), len(carga)) + carga)
+        self._escritos += CABECERA.size + len(carga)
+
+    def inicio(self, robot_id):
+        with self._lock:
+            self._escribir(INICIO, robot_id)
+
+    def frame(self, robot_id, datos_camara):
+        objeto = str(datos_camara.get("objeto") or "").encode("utf-8")
+        carga = FRAME_CARGA.pack(float(datos_camara.get("tamaño", 0)),
+                                 datos_camara.get("secuencia", 0) & 0xFFFFFFFF) + objeto
+        with self._lock:
+            self._escribir(FRAME, robot_id, carga)
+
+    def comando(self, robot_id, comando):
+        with self._lock:
+            self._escribir(COMANDO, robot_id, comando.encode("utf-8"))
+
+    def cerrar_archivo(self):
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+    def cerrar(self):
+        with self._lock:
+            self.cerrar_archivo()
+
+
+def _tamaño_original(valor):
+    """Los tamaños se guardan como double; los enteros vuelven a ser int"""
+    return int(valor) if valor.is_integer() else valor
+
+
+def _estado_grabado(carga):
+    estado = EstadoRobot()
+    for campo, valor in json.loads(carga).items():
+        setattr(estado, campo, valor)
+    estado.estado_actual = Estado(estado.estado_actual)
+    return estado
+
+
+def leer_registros(ruta):
+    """Genera (tipo, robot_id, instante, dato) de un archivo .rblog
+
+    dato es el dict de cámara en FRAME, el comando en COMANDO, un EstadoRobot
+    en ESTADO y None en INICIO.
+    """
+    with open(ruta, "rb") as archivo:
+        contenido = archivo.read()
+    if not contenido.startswith(MAGIA):
+        raise ValueError(f"{ruta} no es un log de sesiones")
+
+    robots = {}
+    posicion = len(MAGIA)
+    while posicion + CABECERA.size <= len(contenido):
+        tipo, indice, instante, longitud = CABECERA.unpack_from(contenido, posicion)
+        posicion += CABECERA.size
+        carga = contenido[posicion:posicion + longitud]
+        if len(carga) < longitud:
+            break  # registro a medio escribir al final del archivo
+        posicion += longitud
+
+        if tipo == ROBOT:
+            robots[indice] = carga.decode("utf-8")
+        elif tipo == INICIO:
+            yield INICIO, robots[indice], instante, None
+        elif tipo == FRAME:
+            tamaño, secuencia = FRAME_CARGA.unpack_from(carga)
+            objeto = carga[FRAME_CARGA.size:].decode("utf-8")
+            yield FRAME, robots[indice], instante, {
+                "objeto": objeto, "tamaño": _tamaño_original(tamaño), "secuencia": secuencia
+            }
+        elif tipo == COMANDO:
+            yield COMANDO, robots[indice], instante, carga.decode("utf-8")
+        elif tipo == ESTADO:
+            yield ESTADO, robots[indice], instante, _estado_grabado(carga)
+
+
+def archivos_de_log(rutas):
+    """Expande directorios a sus .rblog, en orden de nombre (= orden de escritura)"""
+    archivos = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            archivos.extend(sorted(
+                os.path.join(ruta, nombre) for nombre in os.listdir(ruta) if nombre.endswith(".rblog")
+            ))
+        else:
+            archivos.append(ruta)
+    return archivos
@@ -0,0 +1,23 @@
+class LoteComandos:
+    """Comandos salientes de un tick, enviados al robot con una sola escritura"""
+
+    __slots__ = ("mensajes",)
+
+    def __init__(self):
+        self.mensajes = []
+
+    def agregar(self, mensaje):
+        """Encola un comando ya codificado (texto terminado en '\\n' o registro binario)"""
+        self.mensajes.append(mensaje)
+
+    def enviar(self, client_socket):
+        """Escribe todo el lote con un único sendall y lo vacía; devuelve los bytes escritos"""
+        if not self.mensajes:
+            return 0
+        datos = self.mensajes[0] if len(self.mensajes) == 1 else b"".join(self.mensajes)
+        self.mensajes.clear()
+        client_socket.sendall(datos)
+        return len(datos)
+
+    def __len__(self):
+        return len(self.mensajes)
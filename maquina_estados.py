@@ -0,0 +1,355 @@
+import logging
+import sys
+from enum import Enum
+
+from registro import log, log_tick
+
+
+class Estado(Enum):
+    """Estados del robot recolector"""
+    BUSCAR_OBJETO = "buscar_objeto"
+    IR_AL_OBJETO = "ir_al_objeto"
+    RECOGER = "recoger"
+    BUSCAR_DESTINO = "buscar_destino"
+    IR_A_DESTINO = "ir_a_destino"
+    DEJAR_OBJETO = "dejar_objeto"
+
+
+class Transicion:
+    """Regla de la especificación: si se cumplen todas las guardas, se aplica
+
+    comando    comando a enviar (str) o función estado_robot -> str
+    destino    estado siguiente (None = se queda en el mismo)
+    accion     función que actualiza el estado del robot
+    velocidad  perfil de velocidad a aplicar (solo lo usan los servidores que lo soportan)
+    mensaje    texto para la consola; admite {r} robot, {o}/{O} objeto, {t} tamaño, {e.campo} estado
+    """
+
+    __slots__ = ("guardas", "comando", "destino", "accion", "velocidad", "mensaje")
+
+    def __init__(self, guardas=(), comando="PARAR", destino=None, accion=None,
+                 velocidad=None, mensaje=None):
+        self.guardas = tuple(guardas)
+        self.comando = comando
+        self.destino = destino
+        self.accion = accion
+        self.velocidad = velocidad
+        self.mensaje = mensaje
+
+
+# Nombres de clase de objeto ya vistos, internados: las comparaciones con
+# objetos_validos/destinos resuelven por identidad y no se guarda un str por frame
+_CLASES = {}
+_MAXIMO_CLASES = 256
+
+
+def clase_objeto(nombre):
+    """Devuelve la versión internada del nombre de clase que reporta la cámara"""
+    clase = _CLASES.get(nombre)
+    if clase is None:
+        if len(_CLASES) >= _MAXIMO_CLASES:
+            # Texto arbitrario de la cámara: no dejar crecer la tabla sin límite
+            return nombre
+        clase = _CLASES[nombre] = sys.intern(nombre)
+    return clase
+
+
+# ---------------------------------------------------------------------------
+# Guardas: (config, estado_robot, objeto, tamaño) -> bool
+# config es el servidor (tamaño_minimo, tamaño_maximo, objetos_validos, ...)
+# ---------------------------------------------------------------------------
+
+def objeto_valido(c, e, objeto, tamaño):
+    return objeto in c.objetos_validos
+
+
+def objeto_visible(c, e, objeto, tamaño):
+    return objeto in c.objetos_validos and tamaño > 10
+
+
+def lejos(c, e, objeto, tamaño):
+    return tamaño < c.tamaño_minimo
+
+
+def muy_cerca(c, e, objeto, tamaño):
+    return tamaño >= c.tamaño_maximo
+
+
+def destino_valido(c, e, objeto, tamaño):
+    return objeto in destinos_para(c, e.objeto_detectado)
+
+
+def destino_visible(c, e, objeto, tamaño):
+    return tamaño > 20 and objeto in destinos_para(c, e.objeto_detectado)
+
+
+def intento_menor_que(limite):
+    """El intento en curso (contador + 1) es menor que limite"""
+    def guarda(c, e, objeto, tamaño):
+        return e.intentos_busqueda + 1 < limite
+    return guarda
+
+
+def no(guarda):
+    def negada(c, e, objeto, tamaño):
+        return not guarda(c, e, objeto, tamaño)
+    return negada
+
+
+def destinos_para(c, objeto_en_mano):
+    """Destinos válidos según el objeto que lleva el robot"""
+    if objeto_en_mano == "cuadrado":
+        return c.destinos_validos_cuadrado
+    elif objeto_en_mano == "cilindro":
+        return c.destinos_validos_cilindro
+    return ()
+
+
+# ---------------------------------------------------------------------------
+# Acciones: (estado_robot, objeto, tamaño) -> None  (estado_robot es un EstadoRobot)
+# ---------------------------------------------------------------------------
+
+def fijar_objeto(e, objeto, tamaño):
+    e.objeto_detectado = objeto
+    e.tamaño_objeto = tamaño
+    e.intentos_busqueda = 0
+
+
+def contar_intento(e, objeto, tamaño):
+    e.intentos_busqueda += 1
+
+
+def invertir_giro(e, objeto, tamaño):
+    e.direccion_giro = "izquierda" if e.direccion_giro == "derecha" else "derecha"
+    e.intentos_busqueda = 0
+
+
+def reiniciar_intentos(e, objeto, tamaño):
+    e.intentos_busqueda = 0
+
+
+def perder_objeto(e, objeto, tamaño):
+    e.objeto_detectado = None
+
+
+def actualizar_tamaño(e, objeto, tamaño):
+    e.tamaño_objeto = tamaño
+
+
+def tomar_objeto(e, objeto, tamaño):
+    e.tiene_objeto = True
+    e.intentos_busqueda = 0
+
+
+def fijar_destino(e, objeto, tamaño):
+    e.destino_detectado = objeto
+    e.intentos_busqueda = 0
+
+
+def perder_destino(e, objeto, tamaño):
+    e.destino_detectado = None
+
+
+def entregar_objeto(e, objeto, tamaño):
+    e.tiene_objeto = False
+    e.objeto_detectado = None
+    e.destino_detectado = None
+    e.intentos_busqueda = 0
+    e.velocidad_actual = None
+
+
+def girar_segun_direccion(e):
+    return "GIRAR_DERECHA" if e.direccion_giro == "derecha" else "GIRAR_IZQUIERDA"
+
+
+# Límites de búsqueda: intentos (frames sin ver nada) antes de cambiar de táctica
+LIMITE_AVANCE_OBJETO = 3          # avanza mientras intento < 3, luego gira
+LIMITE_GIRO_OBJETO = 8            # a los 8 invierte el sentido de giro
+LIMITE_GIRO_DESTINO = 13          # 12 giros = ~360°
+LIMITE_EXPLORACION_DESTINO = 20   # luego avanza explorando hasta 20 y reinicia
+
+
+# ---------------------------------------------------------------------------
+# Especificación del robot recolector (comandos en el vocabulario de server.py)
+# Las transiciones de cada estado se evalúan en orden; la última no tiene guardas.
+# ---------------------------------------------------------------------------
+
+ESPECIFICACION = {
+    Estado.BUSCAR_OBJETO: [
+        Transicion(
+            guardas=(objeto_visible, lejos), comando="AVANZAR", destino=Estado.IR_AL_OBJETO,
+            accion=fijar_objeto, velocidad="buscar_objeto",
+            mensaje="🎯 [{r}] ¡Objeto detectado! {O} (tamaño: {t})"),
+        Transicion(
+            guardas=(objeto_visible,), comando="AVANZAR_LENTO", destino=Estado.IR_AL_OBJETO,
+            accion=fijar_objeto, velocidad="buscar_objeto",
+            mensaje="🎯 [{r}] ¡Objeto detectado! {O} (tamaño: {t})"),
+        Transicion(
+            guardas=(intento_menor_que(LIMITE_AVANCE_OBJETO),), comando="AVANZAR",
+            accion=contar_intento, velocidad="buscar_objeto",
+            mensaje="🔍 [{r}] Buscando... avanzando ({e.intentos_busqueda}/3)"),
+        Transicion(
+            guardas=(intento_menor_que(LIMITE_GIRO_OBJETO),), comando=girar_segun_direccion,
+            accion=contar_intento, velocidad="buscar_objeto",
+            mensaje="🔍 [{r}] Buscando... girando {e.direccion_giro}"),
+        Transicion(
+            comando=girar_segun_direccion, accion=invertir_giro, velocidad="buscar_objeto",
+            mensaje="🔄 [{r}] Cambiando dirección de búsqueda"),
+    ],
+    Estado.IR_AL_OBJETO: [
+        Transicion(
+            guardas=(no(objeto_valido),), comando="PARAR", destino=Estado.BUSCAR_OBJETO,
+            accion=perder_objeto,
+            mensaje="⚠️ [{r}] Objeto perdido, volviendo a buscar"),
+        Transicion(
+            guardas=(muy_cerca,), comando="PARAR", destino=Estado.RECOGER,
+            accion=actualizar_tamaño,
+            mensaje="✋ [{r}] Suficientemente cerca (tamaño: {t})"),
+        Transicion(
+            guardas=(lejos,), comando="AVANZAR",
+            accion=actualizar_tamaño, velocidad="ir_al_objeto",
+            mensaje="⬆️ [{r}] Muy lejos, avanzando (tamaño: {t})"),
+        Transicion(
+            comando="AVANZAR_LENTO", accion=actualizar_tamaño, velocidad="ir_al_objeto_lento",
+            mensaje="🐌 [{r}] Acercándose lentamente (tamaño: {t})"),
+    ],
+    Estado.RECOGER: [
+        Transicion(
+            comando="RECOGER", destino=Estado.BUSCAR_DESTINO, accion=tomar_objeto,
+            mensaje="✅ [{r}] Objeto recogido exitosamente"),
+    ],
+    Estado.BUSCAR_DESTINO: [
+        Transicion(
+            guardas=(destino_visible,), comando="AVANZAR", destino=Estado.IR_A_DESTINO,
+            accion=fijar_destino, velocidad="buscar_destino",
+            mensaje="🎯 [{r}] ¡Destino detectado! {O} para {e.objeto_detectado}"),
+        Transicion(
+            guardas=(intento_menor_que(LIMITE_GIRO_DESTINO),), comando="GIRAR_DERECHA",
+            accion=contar_intento, velocidad="buscar_destino",
+            mensaje="🔍 [{r}] Buscando destino para {e.objeto_detectado}... giro {e.intentos_busqueda}/12"),
+        Transicion(
+            guardas=(intento_menor_que(LIMITE_EXPLORACION_DESTINO),), comando="AVANZAR",
+            accion=contar_intento, velocidad="exploracion",
+            mensaje="🔍 [{r}] Destino no encontrado, explorando..."),
+        Transicion(
+            comando="GIRAR_DERECHA", accion=reiniciar_intentos, velocidad="buscar_destino"),
+    ],
+    Estado.IR_A_DESTINO: [
+        Transicion(
+            guardas=(no(destino_valido),), comando="PARAR", destino=Estado.BUSCAR_DESTINO,
+            accion=perder_destino,
+            mensaje="⚠️ [{r}] Destino perdido, volviendo a buscar"),
+        Transicion(
+            guardas=(muy_cerca,), comando="PARAR", destino=Estado.DEJAR_OBJETO,
+            mensaje="🎯 [{r}] Llegó al destino"),
+        Transicion(
+            guardas=(lejos,), comando="AVANZAR", velocidad="ir_a_destino",
+            mensaje="➡️ [{r}] Yendo al destino (tamaño: {t})"),
+        Transicion(
+            comando="AVANZAR_LENTO", velocidad="ir_a_destino_lento",
+            mensaje="🐌 [{r}] Acercándose lentamente al destino (tamaño: {t})"),
+    ],
+    Estado.DEJAR_OBJETO: [
+        Transicion(
+            comando="SOLTAR", destino=Estado.BUSCAR_OBJETO, accion=entregar_objeto,
+            mensaje="🎉 [{r}] ¡Ciclo completado! Objeto entregado, buscando nuevo objeto..."),
+    ],
+}
+
+
+def compilar(especificacion, traduccion_comandos=None):
+    """Convierte la especificación en una tabla {Estado: (Transicion, ...)}
+
+    Los comandos fijos se traducen una sola vez al vocabulario del servidor;
+    los comandos calculados se envuelven para traducir su resultado.
+    """
+    traduccion = traduccion_comandos or {}
+    tabla = {}
+
+    for estado, transiciones in especificacion.items():
+        if not isinstance(estado, Estado):
+            raise ValueError(f"Estado desconocido en la especificación: {estado!r}")
+        if not transiciones or transiciones[-1].guardas:
+            raise ValueError(f"La última transición de {estado.name} no debe tener guardas")
+
+        compiladas = []
+        for t in transiciones:
+            if t.destino is not None and not isinstance(t.destino, Estado):
+                raise ValueError(f"Destino desconocido en {estado.name}: {t.destino!r}")
+
+            comando = t.comando
+            if callable(comando):
+                comando = _traducir_calculado(comando, traduccion)
+            else:
+                comando = traduccion.get(comando, comando)
+
+            compiladas.append(Transicion(
+                guardas=t.guardas,
+                comando=comando,
+                destino=t.destino if t.destino is not estado else None,
+                accion=t.accion,
+                velocidad=t.velocidad,
+                mensaje=t.mensaje,
+            ))
+        tabla[estado] = tuple(compiladas)
+
+    return tabla
+
+
+def _traducir_calculado(funcion, traduccion):
+    def comando(e):
+        resultado = funcion(e)
+        return traduccion.get(resultado, resultado)
+    return comando
+
+
+class MaquinaEstados:
+    """Ejecuta la tabla de transiciones compilada para un servidor"""
+
+    def __init__(self, config, especificacion=ESPECIFICACION, traduccion_comandos=None):
+        self.config = config
+        self.tabla = compilar(especificacion, traduccion_comandos)
+
+    def paso(self, datos_camara, estado_robot, robot_id):
+        """Avanza un frame: devuelve (comando, perfil_de_velocidad)"""
+        transiciones = self.tabla.get(estado_robot.estado_actual)
+        if transiciones is None:
+            return "PARAR", None
+
+        objeto = clase_objeto((datos_camara.get("objeto") or "").lower())
+        tamaño = datos_camara.get("tamaño", 0)
+        config = self.config
+
+        for transicion in transiciones:
+            for guarda in transicion.guardas:
+                if not guarda(config, estado_robot, objeto, tamaño):
+                    break
+            else:
+                return self._aplicar(transicion, estado_robot, robot_id, objeto, tamaño)
+
+        return "PARAR", None
+
+    def _aplicar(self, transicion, estado_robot, robot_id, objeto, tamaño):
+        if transicion.accion is not None:
+            transicion.accion(estado_robot, objeto, tamaño)
+
+        comando = transicion.comando
+        if callable(comando):
+            comando = comando(estado_robot)
+
+        if transicion.mensaje:
+            # Los cambios de estado van a INFO; el resto de mensajes es por tick (DEBUG)
+            if transicion.destino is not None:
+                registro, nivel = log, logging.INFO
+            else:
+                registro, nivel = log_tick, logging.DEBUG
+            if registro.isEnabledFor(nivel):
+                registro.log(nivel, transicion.mensaje.format(
+                    r=robot_id, o=objeto, O=objeto.upper(), t=tamaño, e=estado_robot
+                ))
+
+        if transicion.destino is not None:
+            estado_robot.estado_actual = transicion.destino
+            log.info("🔄 [%s] Cambiando a estado: %s", robot_id, transicion.destino.name)
+
+        return comando, transicion.velocidad
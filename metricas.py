@@ -0,0 +1,240 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+# Cubetas de los histogramas: límites geométricos de factor √2 desde 1 µs
+MINIMO_CUBETA = 1e-6
+NUMERO_CUBETAS = 48
+LIMITES_CUBETAS = tuple(MINIMO_CUBETA * 2 ** (i / 2) for i in range(NUMERO_CUBETAS))
+
+# Reconexiones: una sesión nueva de un robot cuya sesión anterior terminó hace
+# menos de VENTANA_RECONEXION s; se recuerdan como mucho MAXIMO_IDENTIDADES robots
+VENTANA_RECONEXION = 300.0
+MAXIMO_IDENTIDADES = 4096
+
+
+class Histograma:
+    """Histograma de duraciones con memoria fija (cubetas geométricas de factor √2)
+
+    Cubre de 1 µs a ~16 s; los valores fuera de rango caen en la primera o la
+    última cubeta. observar() es O(1) y no reserva memoria.
+    """
+
+    __slots__ = ("cuentas", "total", "suma", "maximo")
+
+    def __init__(self):
+        self.cuentas = [0] * NUMERO_CUBETAS
+        self.total = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def observar(self, segundos):
+        if segundos <= MINIMO_CUBETA:
+            indice = 0
+        else:
+            indice = min(NUMERO_CUBETAS - 1, math.ceil(2 * math.log2(segundos / MINIMO_CUBETA)))
+        self.cuentas[indice] += 1
+        self.total += 1
+        self.suma += segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+
+    def fusionar(self, otro):
+        """Suma las observaciones de otro histograma a este"""
+        for i, cuenta in enumerate(otro.cuentas):
+            self.cuentas[i] += cuenta
+        self.total += otro.total
+        self.suma += otro.suma
+        self.maximo = max(self.maximo, otro.maximo)
+
+    def percentil(self, p):
+        """Límite superior de la cubeta que contiene el percentil p (segundos)"""
+        if not self.total:
+            return 0.0
+        objetivo = p / 100 * self.total
+        acumulado = 0
+        for i, cuenta in enumerate(self.cuentas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return min(LIMITES_CUBETAS[i], self.maximo)
+        return self.maximo
+
+    def resumen(self):
+        """Cuenta, media y percentiles en milisegundos"""
+        return {
+            "cuenta": self.total,
+            "media_ms": round(self.suma / self.total * 1000, 3) if self.total else 0.0,
+            "p50_ms": round(self.percentil(50) * 1000, 3),
+            "p95_ms": round(self.percentil(95) * 1000, 3),
+            "p99_ms": round(self.percentil(99) * 1000, 3),
+            "max_ms": round(self.maximo * 1000, 3),
+        }
+
+
+class MetricasRobot:
+    """Contadores y tiempos por fase de un robot
+
+    Solo los actualiza el hilo/corrutina que atiende al robot, así que no
+    necesitan lock; las lecturas de instantanea() son aproximadas por diseño.
+    """
+
+    FASES = ("decodificacion", "decision", "envio")
+
+    __slots__ = ("inicio", "ultima_actividad", "frames", "frames_descartados", "comandos_omitidos",
+                 "comandos", "bytes_entrada", "bytes_salida", "retraso") + FASES
+
+    def __init__(self):
+        self.inicio = time.monotonic()
+        # Último frame procesado (monotónico); lo usa el segador de sesiones inactivas
+        self.ultima_actividad = self.inicio
+        self.frames = 0
+        # Frames reemplazados por uno más reciente antes de decidir (solo_ultimo_frame)
+        self.frames_descartados = 0
+        # Comandos no enviados porque no cambiaban los actuadores (solo_cambios)
+        self.comandos_omitidos = 0
+        # Comandos decididos por tipo
+        self.comandos = {}
+        self.bytes_entrada = 0
+        self.bytes_salida = 0
+        self.decodificacion = Histograma()
+        self.decision = Histograma()
+        self.envio = Histograma()
+        # Cuánto se pasó de su deadline cada tick que no cumplió el periodo (PlanificadorCiclo)
+        self.retraso = Histograma()
+
+    def fusionar(self, otro):
+        self.frames += otro.frames
+        self.frames_descartados += otro.frames_descartados
+        self.comandos_omitidos += otro.comandos_omitidos
+        for comando, cuenta in list(otro.comandos.items()):
+            self.comandos[comando] = self.comandos.get(comando, 0) + cuenta
+        self.bytes_entrada += otro.bytes_entrada
+        self.bytes_salida += otro.bytes_salida
+        self.retraso.fusionar(otro.retraso)
+        for fase in self.FASES:
+            getattr(self, fase).fusionar(getattr(otro, fase))
+
+    def resumen(self, ahora=None):
+        duracion = (ahora or time.monotonic()) - self.inicio
+        resumen = {
+            "frames": self.frames,
+            "frames_por_s": round(self.frames / duracion, 2) if duracion > 0 else 0.0,
+            "frames_descartados": self.frames_descartados,
+            "comandos_omitidos": self.comandos_omitidos,
+            "comandos": dict(self.comandos),
+            "bytes_entrada": self.bytes_entrada,
+            "bytes_salida": self.bytes_salida,
+            "retraso": self.retraso.resumen(),
+        }
+        for fase in self.FASES:
+            resumen[fase] = getattr(self, fase).resumen()
+        return resumen
+
+
+class MetricasServidor:
+    """Registro de métricas de todos los robots de un servidor"""
+
+    def __init__(self):
+        self.inicio = time.monotonic()
+        self.robots = {}
+        # Acumulado de los robots que ya se desconectaron
+        self.historico = MetricasRobot()
+        self._lock = threading.Lock()
+
+        # Admisión de conexiones (solo las actualiza el hilo que acepta)
+        self.conexiones_aceptadas = 0
+        self.conexiones_rechazadas = 0
+        self.rafaga_maxima = 0
+        self.admision = Histograma()
+        # Reconexiones según el robot_id que informa cada robot en sus frames
+        # (ip:puerto cambia en cada conexión y la IP la comparten varios robots)
+        self.reconexiones = 0
+        self._identidades = {}
+        self._sesiones_cerradas = OrderedDict()
+
+    def robot(self, robot_id):
+        """Métricas del robot (las crea si todavía no existen)"""
+        metricas = self.robots.get(robot_id)
+        if metricas is None:
+            with self._lock:
+                metricas = self.robots.setdefault(robot_id, MetricasRobot())
+        return metricas
+
+    def registrar_rafaga(self, conexiones, aceptadas, segundos):
+        """Anota una ráfaga de accept: tamaño, admitidas y tiempo en despacharla"""
+        self.conexiones_aceptadas += aceptadas
+        self.conexiones_rechazadas += conexiones - aceptadas
+        if conexiones > self.rafaga_maxima:
+            self.rafaga_maxima = conexiones
+        self.admision.observar(segundos)
+
+    def identificar(self, robot_id, identidad):
+        """Asocia la sesión a la identidad del robot; cuenta una reconexión si cerró sesión hace poco"""
+        if identidad is None:
+            return
+        with self._lock:
+            self._identidades[robot_id] = identidad
+            cierre = self._sesiones_cerradas.pop(identidad, None)
+            if cierre is not None and time.monotonic() - cierre < VENTANA_RECONEXION:
+                self.reconexiones += 1
+
+    def retirar(self, robot_id):
+        """Pasa las métricas de un robot desconectado al histórico"""
+        with self._lock:
+            metricas = self.robots.pop(robot_id, None)
+            if metricas is not None:
+                self.historico.fusionar(metricas)
+            identidad = self._identidades.pop(robot_id, None)
+            if identidad is not None:
+                self._sesiones_cerradas[identidad] = time.monotonic()
+                self._sesiones_cerradas.move_to_end(identidad)
+                if len(self._sesiones_cerradas) > MAXIMO_IDENTIDADES:
+                    self._sesiones_cerradas.popitem(last=False)
+
+    def inactivos(self, limite):
+        """Robots sin actividad desde antes del instante monotónico limite"""
+        with self._lock:
+            return [robot_id for robot_id, metricas in self.robots.items()
+                    if metricas.ultima_actividad < limite]
+
+    def agregado(self):
+        """Suma de todos los robots (conectados y desconectados) en un MetricasRobot"""
+        with self._lock:
+            robots = list(self.robots.values())
+            agregado = MetricasRobot()
+            agregado.fusionar(self.historico)
+        for metricas in robots:
+            agregado.fusionar(metricas)
+        agregado.inicio = self.inicio
+        return agregado
+
+    def conexiones(self):
+        """Contadores de admisión y reconexión (sin el histograma de admisión)"""
+        return {
+            "aceptadas": self.conexiones_aceptadas,
+            "rechazadas": self.conexiones_rechazadas,
+            "rafaga_maxima": self.rafaga_maxima,
+            "reconexiones": self.reconexiones,
+        }
+
+    def instantanea(self):
+        """Foto de las métricas: por robot y agregadas (incluye desconectados)"""
+        ahora = time.monotonic()
+        with self._lock:
+            robots = list(self.robots.items())
+            agregado = MetricasRobot()
+            agregado.fusionar(self.historico)
+
+        por_robot = {}
+        for robot_id, metricas in robots:
+            agregado.fusionar(metricas)
+            por_robot[robot_id] = metricas.resumen(ahora)
+
+        agregado.inicio = self.inicio
+        return {
+            "robots_conectados": len(robots),
+            "agregado": agregado.resumen(ahora),
+            "robots": por_robot,
+            "conexiones": dict(self.conexiones(), admision=self.admision.resumen()),
+        }
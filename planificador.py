@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+from registro import log_tick
+
+
+class PlanificadorCiclo:
+    """Marca el ritmo del bucle de control de un robot con deadlines fijos
+
+    Cada tick empieza al llegar un frame de la cámara y su deadline es
+    inicio + 1/frecuencia_hz. Al terminar el tick solo se duerme el tiempo que
+    falte hasta ese deadline. Con frecuencia_hz = 0 (o None) no se duerme nunca:
+    el robot se controla tan rápido como lleguen los frames.
+
+    Los ticks que terminan después de su deadline se anotan en el histograma
+    retraso de las MetricasRobot del robot (y en /metrics), no en el registro.
+    """
+
+    def __init__(self, frecuencia_hz=10.0, robot_id=None, metricas=None):
+        self.periodo = 1.0 / frecuencia_hz if frecuencia_hz else 0.0
+        self.robot_id = robot_id
+        self.metricas = metricas
+        self.deadline = None
+        self.ticks = 0
+
+    def marcar_inicio(self):
+        """Registra el inicio de un tick (justo después de recibir el frame)"""
+        self.ticks += 1
+        if self.periodo:
+            self.deadline = time.monotonic() + self.periodo
+
+    def tiempo_restante(self):
+        """Segundos que faltan hasta el deadline del tick actual (0 si ya pasó)"""
+        if self.deadline is None:
+            return 0.0
+
+        restante = self.deadline - time.monotonic()
+        self.deadline = None
+        if restante < 0:
+            if self.metricas is not None:
+                self.metricas.retraso.observar(-restante)
+            log_tick.debug("⏰ [%s] Tick %d excedió su deadline por %.1f ms",
+                           self.robot_id, self.ticks, -restante * 1000)
+            return 0.0
+        return restante
+
+    def esperar(self):
+        """Duerme hasta el deadline del tick actual"""
+        restante = self.tiempo_restante()
+        if restante:
+            time.sleep(restante)
+
+    async def esperar_async(self):
+        """Versión asyncio de esperar()"""
+        restante = self.tiempo_restante()
+        if restante:
+            await asyncio.sleep(restante)
@@ -0,0 +1,82 @@
+import struct
+
+from maquina_estados import Estado
+
+# Saludo que el robot envía (como primera trama) para pedir el protocolo binario.
+# Si no lo envía, la sesión sigue en JSON/texto como siempre.
+SALUDO_BINARIO = b"PROTO BIN1"
+RESPUESTA_SALUDO = b"PROTO BIN1 OK\n"
+
+# Frame de cámara (robot -> servidor): clase de objeto, tamaño, secuencia
+FRAME = struct.Struct("!BII")
+# Comando (servidor -> robot): opcode, estado, flags, argumento, secuencia del frame
+COMANDO = struct.Struct("!BBBHI")
+
+FLAG_TIENE_OBJETO = 0x01
+
+# Clases de objeto que puede reportar la cámara (el id es la posición; 0 = nada)
+CLASES_OBJETO = (
+    "",
+    "cuadrado",
+    "cilindro",
+    "contenedor_cuadrado",
+    "contenedor_cilindro",
+)
+ID_CLASE = {nombre: i for i, nombre in enumerate(CLASES_OBJETO)}
+
+# Opcodes de los comandos de server.py y serverz.py (0 = desconocido)
+OPCODES = (
+    "",
+    "AVANZAR",
+    "AVANZAR_LENTO",
+    "RETROCEDER",
+    "GIRAR_IZQUIERDA",
+    "GIRAR_DERECHA",
+    "PARAR",
+    "RECOGER",
+    "SOLTAR",
+    "IZQUIERDA",
+    "DERECHA",
+    "AGARRAR",
+    "VELOCIDADD",
+    "VELOCIDADI",
+)
+OPCODE = {nombre: i for i, nombre in enumerate(OPCODES)}
+
+ESTADOS = (None,) + tuple(Estado)
+ID_ESTADO = {estado: i for i, estado in enumerate(ESTADOS) if estado is not None}
+
+
+def codificar_frame(objeto, tamaño, secuencia=0):
+    """Empaqueta un frame de cámara (lado robot)"""
+    return FRAME.pack(ID_CLASE.get(objeto, 0), tamaño, secuencia & 0xFFFFFFFF)
+
+
+def decodificar_frame(trama):
+    """Convierte un frame binario en el diccionario que usa la máquina de estados"""
+    clase, tamaño, secuencia = FRAME.unpack(trama)
+    objeto = CLASES_OBJETO[clase] if clase < len(CLASES_OBJETO) else ""
+    return {"objeto": objeto, "tamaño": tamaño, "secuencia": secuencia}
+
+
+def codificar_comando(comando, estado=None, tiene_objeto=False, secuencia=0, argumento=0):
+    """Empaqueta un comando para el robot"""
+    return COMANDO.pack(
+        OPCODE.get(comando, 0),
+        ID_ESTADO.get(estado, 0),
+        FLAG_TIENE_OBJETO if tiene_objeto else 0,
+        argumento,
+        secuencia & 0xFFFFFFFF,
+    )
+
+
+def decodificar_comando(trama):
+    """Desempaqueta un comando (lado robot)"""
+    opcode, estado, flags, argumento, secuencia = COMANDO.unpack(trama)
+    return {
+        "comando": OPCODES[opcode] if opcode < len(OPCODES) else "",
+        "estado": ESTADOS[estado].value if 0 < estado < len(ESTADOS) else None,
+        "tiene_objeto": bool(flags & FLAG_TIENE_OBJETO),
+        "argumento": argumento,
+        "secuencia": secuencia,
+    }
@@ -1,11 +1,15 @@
-import socket
 import json
 import random
+import sys
 import time
 
+import transporte
+
 # IP y puerto del servidor (ajusta si es diferente)
 SERVER_IP = '192.168.0.109'
 SERVER_PORT = 1234
+# Se puede pasar otra dirección como argumento: unix:///tmp/robot.sock, memoria://...
+SERVER_DIRECCION = sys.argv[1] if len(sys.argv) > 1 else f"tcp://{SERVER_IP}:{SERVER_PORT}"
 
 # Objetos simulados que el "robot" puede ver
 objetos_simulados = ['cuadrado', 'circulo', 'triangulo', 'contenedor', '']
@@ -18,11 +22,11 @@ def generar_dato_falso():
         "tamaño": tamaño
     }
 
-def cliente_simulado():
+def cliente_simulado(direccion=SERVER_DIRECCION):
+    sock = None
     try:
         # Crear socket y conectar
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect((SERVER_IP, SERVER_PORT))
+        sock = transporte.conectar(direccion)
         print("✅ Cliente conectado al servidor")
 
         while True:
@@ -46,7 +50,8 @@ def cliente_simulado():
     except Exception as e:
         print(f"❌ Error en cliente: {e}")
     finally:
-        sock.close()
+        if sock is not None:
+            sock.close()
         print("🔌 Cliente desconectado")
 
 if __name__ == "__main__":
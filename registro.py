@@ -0,0 +1,82 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+# Loggers del proyecto:
+#   robot        eventos de sesión y cambios de estado (INFO), problemas (WARNING/ERROR)
+#   robot.tick   mensajes de cada frame (DEBUG); se muestrean con MuestreoTick
+log = logging.getLogger("robot")
+log_tick = logging.getLogger("robot.tick")
+
+_listener = None
+
+
+class MuestreoTick(logging.Filter):
+    """Deja pasar solo 1 de cada N mensajes por tick"""
+
+    def __init__(self, cada=1):
+        super().__init__()
+        self.cada = max(1, int(cada))
+        self.contador = 0
+
+    def filter(self, record):
+        self.contador += 1
+        return self.contador % self.cada == 0
+
+
+def configurar_registro(nivel=None, muestreo_tick=None, stream=None):
+    """Configura el registro con escritura en un hilo de fondo
+
+    Los hilos de control solo encolan el mensaje; el QueueListener es quien
+    escribe en stdout. Nivel y muestreo se leen de ROBOT_LOG_NIVEL y
+    ROBOT_LOG_MUESTREO si no se pasan (por defecto INFO y 1).
+    """
+    global _listener
+
+    nivel = (nivel or os.environ.get("ROBOT_LOG_NIVEL", "INFO")).upper()
+    muestreo_tick = muestreo_tick or int(os.environ.get("ROBOT_LOG_MUESTREO", "1"))
+
+    detener_registro()
+
+    salida = logging.StreamHandler(stream or sys.stdout)
+    salida.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(message)s", "%H:%M:%S"))
+
+    cola = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(cola, salida)
+    _listener.start()
+
+    log.handlers = [logging.handlers.QueueHandler(cola)]
+    log.setLevel(nivel)
+    log.propagate = False
+
+    log_tick.filters = []
+    if muestreo_tick > 1:
+        log_tick.addFilter(MuestreoTick(muestreo_tick))
+
+    return log
+
+
+def detener_registro():
+    """Vacía la cola pendiente y detiene el hilo escritor
+
+    Se llama sola al salir (atexit), salvo en los procesos hijos de un fork,
+    que terminan con os._exit y deben llamarla ellos mismos.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(detener_registro)
+
+
+def nivel_desde_argv(argv):
+    """Extrae --log=NIVEL de la línea de comandos (None si no está)"""
+    for arg in argv[1:]:
+        if arg.startswith("--log="):
+            return arg.split("=", 1)[1]
+    return None
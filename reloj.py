@@ -0,0 +1,62 @@
+import time
+from datetime import datetime, timedelta
+
+
+class RelojReal:
+    """Reloj de pared; con escala > 1 las esperas se acortan en esa proporción
+
+    ahora() y fecha() avanzan 'escala' segundos por segundo real, así que las
+    duraciones medidas con el reloj siguen siendo las del escenario original.
+    """
+
+    def __init__(self, escala=1.0):
+        if escala <= 0:
+            raise ValueError("La escala del reloj debe ser mayor que 0")
+        self.escala = escala
+        self._inicio_real = time.monotonic()
+        self._inicio_fecha = datetime.now()
+
+    def ahora(self):
+        """Segundos (monotónicos) transcurridos en tiempo de simulación"""
+        return (time.monotonic() - self._inicio_real) * self.escala
+
+    def fecha(self):
+        if self.escala == 1.0:
+            return datetime.now()
+        return self._inicio_fecha + timedelta(seconds=self.ahora())
+
+    def dormir(self, segundos):
+        if segundos > 0:
+            time.sleep(segundos / self.escala)
+
+
+class RelojVirtual:
+    """Reloj simulado: dormir() avanza el tiempo al instante, sin esperar"""
+
+    def __init__(self, fecha_inicial=None):
+        self._segundos = 0.0
+        self._inicio_fecha = fecha_inicial or datetime.now()
+
+    def ahora(self):
+        return self._segundos
+
+    def fecha(self):
+        return self._inicio_fecha + timedelta(seconds=self._segundos)
+
+    def dormir(self, segundos):
+        if segundos > 0:
+            self._segundos += segundos
+
+    def avanzar(self, segundos):
+        """Adelanta el reloj a mano (p. ej. para simular el tiempo de red)"""
+        self.dormir(segundos)
+
+
+def reloj_desde_argv(argv):
+    """--virtual -> RelojVirtual; --escala=N -> RelojReal(N); si no, tiempo real"""
+    for arg in argv[1:]:
+        if arg == "--virtual":
+            return RelojVirtual()
+        if arg.startswith("--escala="):
+            return RelojReal(float(arg.split("=", 1)[1]))
+    return RelojReal()
@@ -0,0 +1,111 @@
+"""Reproduce logs de grabador.py contra la lógica de decisión, sin sockets ni esperas
+
+Cada frame grabado pasa por procesar_datos_y_estado de un servidor nuevo y el
+comando resultante se compara con el que se envió en su momento. Sirve para
+volver a pasar el tráfico real de la flota tras cambiar umbrales o la
+especificación de la máquina de estados.
+
+Ejemplos:
+    python reproductor.py grabaciones/
+    python reproductor.py grabaciones/ --servidor serverz --config tamaño_minimo=6000
+"""
+import argparse
+import ast
+import importlib
+import time
+from collections import Counter
+
+from grabador import COMANDO, ESTADO, FRAME, INICIO, archivos_de_log, leer_registros
+from lote_comandos import LoteComandos
+from registro import configurar_registro
+
+
+def crear_servidor(modulo, ajustes):
+    """Servidor sin abrir puerto, con los atributos de configuración sobrescritos"""
+    servidor = importlib.import_module(modulo).ServidorRobotRecolector()
+    for ajuste in ajustes:
+        clave, valor = ajuste.split("=", 1)
+        if not hasattr(servidor, clave):
+            raise SystemExit(f"❌ El servidor no tiene el parámetro {clave!r}")
+        try:
+            valor = ast.literal_eval(valor)
+        except (ValueError, SyntaxError):
+            pass  # se queda como texto
+        setattr(servidor, clave, valor)
+    return servidor
+
+
+def reproducir(servidor, archivos):
+    """Devuelve (frames, diferencias); diferencias = [(robot_id, instante, frame, grabado, nuevo)]"""
+    # serverz.py acumula las velocidades del tick en un lote
+    lote = LoteComandos() if hasattr(servidor, "configurar_velocidad") else None
+    pendientes = {}
+    diferencias = []
+    frames = 0
+
+    for archivo in archivos:
+        for tipo, robot_id, instante, dato in leer_registros(archivo):
+            if tipo == FRAME:
+                frames += 1
+                if lote is None:
+                    comando = servidor.procesar_datos_y_estado(dato, robot_id)
+                else:
+                    comando = servidor.procesar_datos_y_estado(dato, robot_id, lote)
+                    lote.mensajes.clear()
+                pendientes[robot_id] = (instante, dato, comando)
+            elif tipo == COMANDO:
+                if robot_id not in pendientes:
+                    continue  # frame en el archivo anterior a la rotación
+                instante, frame, comando = pendientes.pop(robot_id)
+                if comando != dato:
+                    diferencias.append((robot_id, instante, frame, dato, comando))
+            elif tipo == INICIO:
+                servidor.inicializar_estado_robot(robot_id)
+            elif tipo == ESTADO:
+                # Archivo rotado con el robot a mitad de sesión: si ya se reprodujo
+                # desde su INICIO se sigue con el estado calculado aquí
+                if robot_id not in servidor.estados_robot:
+                    servidor.estados_robot[robot_id] = dato
+
+    return frames, diferencias
+
+
+def mostrar_informe(frames, diferencias, duracion, mostrar):
+    print("=" * 60)
+    print("📼 REPRODUCCIÓN DE SESIONES")
+    print("=" * 60)
+    print(f"🎞️ Frames: {frames} en {duracion:.2f}s ({frames / duracion if duracion else 0:,.0f} frames/s)")
+    print(f"{'✅' if not diferencias else '⚠️'} Comandos distintos: {len(diferencias)}")
+
+    if diferencias:
+        print("\n🔀 Cambios más frecuentes (grabado → nuevo):")
+        for (grabado, nuevo), cuenta in Counter((d[3], d[4]) for d in diferencias).most_common(10):
+            print(f"   {grabado} → {nuevo}: {cuenta}")
+        print(f"\n🔍 Primeras {min(mostrar, len(diferencias))} diferencias:")
+        for robot_id, instante, frame, grabado, nuevo in diferencias[:mostrar]:
+            hora = time.strftime("%H:%M:%S", time.localtime(instante))
+            print(f"   {hora} [{robot_id}] {frame['objeto'] or '-'} ({frame['tamaño']}): "
+                  f"{grabado} → {nuevo}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduce sesiones grabadas contra la lógica de decisión")
+    parser.add_argument("logs", nargs="+", help="archivos .rblog o directorios con ellos")
+    parser.add_argument("--servidor", default="server", choices=["server", "serverz"])
+    parser.add_argument("--config", action="append", default=[], metavar="CLAVE=VALOR",
+                        help="sobrescribe un parámetro del servidor (p. ej. tamaño_minimo=60)")
+    parser.add_argument("--mostrar", type=int, default=20, help="diferencias a listar")
+    parser.add_argument("--log", default="WARNING", help="nivel de registro durante la reproducción")
+    args = parser.parse_args()
+
+    configurar_registro(args.log)
+    servidor = crear_servidor(args.servidor, args.config)
+    archivos = archivos_de_log(args.logs)
+
+    inicio = time.perf_counter()
+    frames, diferencias = reproducir(servidor, archivos)
+    mostrar_informe(frames, diferencias, time.perf_counter() - inicio, args.mostrar)
+
+
+if __name__ == "__main__":
+    main()
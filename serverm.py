@@ -4,32 +4,61 @@
 ###PRUEBA MANUAL#############
 
 
+import selectors
 import socket
+import sys
 import threading
 import time
 from datetime import datetime
 
+import transporte
+from cola_salida import ESPERA_MAXIMA, ColaSalida
+from exportador_metricas import ExportadorMetricas, TextoPrometheus
+from metricas import Histograma
+from registro import configurar_registro, log_tick, nivel_desde_argv
+
 class ServidorControlManual:
     def __init__(self, host='0.0.0.0', port=1234):
         self.host = host
         self.port = port
+        # Transporte: None = tcp://host:port; también unix:///ruta o memoria://nombre
+        self.direccion = None
         self.socket = None
         self.running = False
         self.robots_conectados = {}
+        # Un solo hilo de E/S multiplexa el listener y todos los robots
+        self.selector = None
+        self.io_thread = None
+        # La consola despierta al bucle de E/S escribiendo en este par de sockets
+        self.despertador = None
+        # Un robot con un comando sin entregar durante más de esto se desconecta
+        self.espera_maxima = ESPERA_MAXIMA
+        # Contadores para /metrics (el histórico recoge las colas de robots ya desconectados)
+        self.comandos_enviados = {}
+        self.latencia_historica = Histograma()
+        self.descartes_historicos = 0
         
     def iniciar_servidor(self):
-        """Inicia el servidor TCP"""
+        """Inicia el servidor (TCP o socket Unix según self.direccion)"""
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.socket.bind((self.host, self.port))
-            self.socket.listen(5)
+            esquema, _ = transporte.parsear_direccion(self.direccion_escucha())
+            if esquema == "memoria":
+                # El bucle de selectors necesita descriptores de archivo reales
+                raise OSError("El servidor manual solo admite tcp:// o unix://")
+            self.socket = transporte.escuchar(self.direccion_escucha(), backlog=5)
+            self.socket.setblocking(False)
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(self.socket, selectors.EVENT_READ, None)
+            self.despertador = socket.socketpair()
+            for extremo in self.despertador:
+                extremo.setblocking(False)
+            self.selector.register(self.despertador[0], selectors.EVENT_READ, "despertar")
             self.running = True
             
             print("=" * 60)
             print("🤖 SERVIDOR DE CONTROL MANUAL INICIADO")
             print("=" * 60)
-            print(f"📡 Escuchando en: {self.host}:{self.port}")
+            print(f"📡 Escuchando en: {self.direccion_escucha()}")
             print(f"🕐 Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             print("\n📋 COMANDOS DISPONIBLES:")
             print("   avanzar     - Robot avanza")
@@ -43,10 +72,10 @@ class ServidorControlManual:
             print("   salir       - Cierra el servidor")
             print("\n⏳ Esperando conexiones de robots...")
             
-            # Iniciar hilo para aceptar conexiones
-            accept_thread = threading.Thread(target=self.aceptar_conexiones)
-            accept_thread.daemon = True
-            accept_thread.start()
+            # Iniciar el hilo de E/S (conexiones, mensajes y envíos de todos los robots)
+            self.io_thread = threading.Thread(target=self.bucle_io)
+            self.io_thread.daemon = True
+            self.io_thread.start()
             
             # Iniciar hilo para comandos de consola
             console_thread = threading.Thread(target=self.manejar_consola)
@@ -60,98 +89,215 @@ class ServidorControlManual:
         except Exception as e:
             print(f"❌ Error iniciando servidor: {e}")
     
-    def aceptar_conexiones(self):
-        """Acepta nuevas conexiones de robots"""
+    def direccion_escucha(self):
+        return self.direccion or f"tcp://{self.host}:{self.port}"
+
+    def bucle_io(self):
+        """Atiende todos los sockets con un único selector: sin hilos ni sondeo por robot"""
+        proxima_revision = time.perf_counter() + self.espera_maxima / 2
         while self.running:
             try:
-                client_socket, address = self.socket.accept()
-                robot_id = f"{address[0]}:{address[1]}"
-                self.robots_conectados[robot_id] = {
-                    'socket': client_socket,
-                    'address': address,
-                    'conectado': True
-                }
-                
-                print(f"\n✅ Robot conectado: {robot_id}")
-                print(f"📊 Total robots conectados: {len(self.robots_conectados)}")
-                
-                # Crear hilo para monitorear este robot
-                monitor_thread = threading.Thread(
-                    target=self.monitorear_robot, 
-                    args=(client_socket, robot_id)
-                )
-                monitor_thread.daemon = True
-                monitor_thread.start()
-                
-            except Exception as e:
-                if self.running:
-                    print(f"❌ Error aceptando conexión: {e}")
-    
-    def monitorear_robot(self, client_socket, robot_id):
-        """Monitorea la conexión de un robot específico"""
+                eventos = self.selector.select(timeout=self.espera_maxima / 2)
+            except OSError:
+                break
+            if time.perf_counter() >= proxima_revision:
+                proxima_revision = time.perf_counter() + self.espera_maxima / 2
+                self.desconectar_atascados()
+            for clave, mascara in eventos:
+                if clave.data is None:
+                    self.aceptar_conexion()
+                elif clave.data == "despertar":
+                    self.atender_despertador()
+                else:
+                    robot_id = clave.data
+                    if mascara & selectors.EVENT_READ:
+                        self.leer_de_robot(robot_id)
+                    if mascara & selectors.EVENT_WRITE:
+                        self.escribir_a_robot(robot_id)
+
+    def despertar(self):
+        """Avisa al bucle de E/S de que hay trabajo nuevo (llamable desde cualquier hilo)"""
         try:
-            while self.running and self.robots_conectados.get(robot_id, {}).get('conectado', False):
-                # Verificar si el robot está conectado
-                try:
-                    client_socket.settimeout(1.0)
-                    # Intentar recibir datos (si el robot envía algo)
-                    data = client_socket.recv(1024)
-                    if not data:
-                        break
-                    # Si el robot envía datos, los mostramos
-                    mensaje = data.decode('utf-8').strip()
-                    if mensaje:
-                        print(f"📨 [{robot_id}] Mensaje: {mensaje}")
-                except socket.timeout:
-                    # Timeout normal, continuar
-                    continue
-                except:
-                    # Conexión perdida
-                    break
-                    
+            self.despertador[1].send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # ya hay un aviso pendiente, o el servidor se está cerrando
+
+    def atender_despertador(self):
+        """Activa la escritura de las colas con datos"""
+        try:
+            while self.despertador[0].recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        for robot_id, robot_info in list(self.robots_conectados.items()):
+            if len(robot_info['cola']) and not robot_info['escribiendo']:
+                robot_info['escribiendo'] = True
+                self.selector.modify(robot_info['socket'],
+                                     selectors.EVENT_READ | selectors.EVENT_WRITE, robot_id)
+
+    def aceptar_conexion(self):
+        """Acepta una nueva conexión de robot"""
+        try:
+            client_socket, robot_id = self.socket.accept()
+        except BlockingIOError:
+            return
         except Exception as e:
-            print(f"❌ [{robot_id}] Error monitoreando: {e}")
-        finally:
+            if self.running:
+                print(f"❌ Error aceptando conexión: {e}")
+            return
+
+        client_socket.setblocking(False)
+        self.robots_conectados[robot_id] = {
+            'socket': client_socket,
+            'address': robot_id,
+            'cola': ColaSalida(),
+            'enviando': None,
+            'encolado': 0.0,
+            'escribiendo': False
+        }
+        self.selector.register(client_socket, selectors.EVENT_READ, robot_id)
+
+        print(f"\n✅ Robot conectado: {robot_id}")
+        print(f"📊 Total robots conectados: {len(self.robots_conectados)}")
+
+    def leer_de_robot(self, robot_id):
+        """Muestra lo que envía un robot; un recv vacío es un cierre y se atiende al instante"""
+        robot_info = self.robots_conectados.get(robot_id)
+        if robot_info is None:
+            return
+        try:
+            data = robot_info['socket'].recv(1024)
+        except BlockingIOError:
+            return
+        except OSError:
+            # Conexión perdida
+            data = b""
+
+        if not data:
             self.desconectar_robot(robot_id)
-    
+            return
+
+        mensaje = data.decode('utf-8', errors='replace').strip()
+        if mensaje:
+            print(f"📨 [{robot_id}] Mensaje: {mensaje}")
+
+    def escribir_a_robot(self, robot_id):
+        """Vacía la cola de salida del robot hasta que el socket deje de admitir datos"""
+        robot_info = self.robots_conectados.get(robot_id)
+        if robot_info is None:
+            return
+        client_socket = robot_info['socket']
+        cola = robot_info['cola']
+
+        try:
+            while True:
+                if robot_info['enviando'] is None:
+                    pendiente = cola.tomar()
+                    if pendiente is None:
+                        # Cola vacía: dejar de vigilar la escritura
+                        robot_info['escribiendo'] = False
+                        self.selector.modify(client_socket, selectors.EVENT_READ, robot_id)
+                        return
+                    datos, robot_info['encolado'] = pendiente
+                    robot_info['enviando'] = memoryview(datos)
+
+                enviado = client_socket.send(robot_info['enviando'])
+                robot_info['enviando'] = robot_info['enviando'][enviado:]
+                if not robot_info['enviando']:
+                    datos = robot_info['enviando'].obj
+                    robot_info['enviando'] = None
+                    latencia = cola.entregado(robot_info['encolado'])
+                    # Nada de print por comando en el hilo de E/S: el resumen está en "robots"
+                    log_tick.debug("📤 [%s] Comando entregado: %s (%.1f ms)",
+                                   robot_id, datos.rstrip(b"\n").decode('utf-8', errors='replace'),
+                                   latencia * 1000)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            print(f"❌ [{robot_id}] Error enviando comando: {e}")
+            self.desconectar_robot(robot_id)
+
+    def desconectar_atascados(self):
+        """Desconecta los robots cuyo comando más antiguo sin entregar supera espera_maxima"""
+        limite = time.perf_counter() - self.espera_maxima
+        for robot_id, robot_info in list(self.robots_conectados.items()):
+            # El mensaje a medio enviar siempre es más antiguo que los de la cola
+            if robot_info['enviando'] is not None:
+                encolado = robot_info['encolado']
+            else:
+                encolado = robot_info['cola'].mas_antiguo()
+            if encolado is not None and encolado < limite:
+                print(f"🐢 [{robot_id}] No consume sus comandos desde hace más de "
+                      f"{self.espera_maxima:.0f} s: desconectando")
+                self.desconectar_robot(robot_id)
+
     def desconectar_robot(self, robot_id):
-        """Desconecta un robot específico"""
-        if robot_id in self.robots_conectados:
+        """Desconecta un robot específico (solo desde el hilo de E/S)"""
+        robot_info = self.robots_conectados.pop(robot_id, None)
+        if robot_info is not None:
+            robot_info['cola'].cerrar()
+            self.latencia_historica.fusionar(robot_info['cola'].latencia)
+            self.descartes_historicos += robot_info['cola'].descartados
             try:
-                self.robots_conectados[robot_id]['socket'].close()
-            except:
+                self.selector.unregister(robot_info['socket'])
+            except (KeyError, ValueError):
+                pass
+            try:
+                robot_info['socket'].close()
+            except OSError:
                 pass
-            del self.robots_conectados[robot_id]
             print(f"🔌 Robot desconectado: {robot_id}")
             print(f"📊 Robots conectados restantes: {len(self.robots_conectados)}")
     
     def enviar_comando_a_robots(self, comando):
-        """Envía un comando a todos los robots conectados"""
+        """Encola un comando para todos los robots conectados (sin esperar a la red)"""
         if not self.robots_conectados:
             print("⚠️ No hay robots conectados")
             return False
         
-        robots_desconectados = []
         comando_enviado = False
+        mensaje = (comando + '\n').encode('utf-8')
+        tipo = comando.split()[0].upper() if comando.split() else comando
+        self.comandos_enviados[tipo] = self.comandos_enviados.get(tipo, 0) + 1
         
-        for robot_id, robot_info in self.robots_conectados.items():
-            try:
-                socket_robot = robot_info['socket']
-                mensaje = comando + '\n'
-                socket_robot.send(mensaje.encode('utf-8'))
-                print(f"📤 [{robot_id}] Comando enviado: {comando}")
+        for robot_id, robot_info in list(self.robots_conectados.items()):
+            if robot_info['cola'].encolar(mensaje):
+                print(f"📤 [{robot_id}] Comando encolado: {comando}")
                 comando_enviado = True
-                
-            except Exception as e:
-                print(f"❌ [{robot_id}] Error enviando comando: {e}")
-                robots_desconectados.append(robot_id)
+            else:
+                # Ráfaga de la consola: se pierde este comando, no la conexión (si el
+                # robot de verdad no lee, lo desconecta desconectar_atascados)
+                print(f"⚠️ [{robot_id}] Cola de salida llena: comando {comando} descartado")
         
-        # Limpiar robots desconectados
-        for robot_id in robots_desconectados:
-            self.desconectar_robot(robot_id)
+        self.despertar()
         
         return comando_enviado
     
+    def metricas_prometheus(self):
+        """Texto de /metrics: robots, comandos por tipo y latencia de entrega"""
+        texto = TextoPrometheus()
+        robots = list(self.robots_conectados.values())
+        latencia = Histograma()
+        latencia.fusionar(self.latencia_historica)
+        descartados = self.descartes_historicos
+        for robot_info in robots:
+            latencia.fusionar(robot_info['cola'].latencia)
+            descartados += robot_info['cola'].descartados
+
+        texto.familia("robot_robots_conectados", "gauge", "Robots con sesión abierta")
+        texto.muestra("robot_robots_conectados", len(robots))
+        texto.familia("robot_comandos_total", "counter", "Comandos de consola enviados por tipo")
+        for tipo, cuenta in sorted(list(self.comandos_enviados.items())):
+            texto.muestra("robot_comandos_total", cuenta, comando=tipo)
+        texto.familia("robot_comandos_descartados_total", "counter",
+                      "Comandos no encolados porque la cola del robot estaba llena")
+        texto.muestra("robot_comandos_descartados_total", descartados)
+        texto.familia("robot_entrega_segundos", "histogram",
+                      "Latencia desde que se encola un comando hasta que se entrega al socket")
+        texto.histograma("robot_entrega_segundos", latencia)
+        return texto.texto()
+
     def procesar_comando_consola(self, comando_input):
         """Procesa comandos ingresados por consola"""
         comando_input = comando_input.strip().lower()
@@ -224,8 +370,11 @@ class ServidorControlManual:
 
         elif comando_input == "robots":
             print(f"📊 Robots conectados: {len(self.robots_conectados)}")
-            for robot_id in self.robots_conectados:
-                print(f"   🤖 {robot_id}")
+            for robot_id, robot_info in list(self.robots_conectados.items()):
+                cola = robot_info['cola'].resumen()
+                latencia = cola['latencia']
+                print(f"   🤖 {robot_id} - entregados: {cola['entregados']}, pendientes: {cola['pendientes']}, "
+                      f"latencia p50/p99: {latencia['p50_ms']}/{latencia['p99_ms']} ms")
         elif comando_input == "ayuda":
             self.mostrar_ayuda()
         else:
@@ -244,7 +393,7 @@ class ServidorControlManual:
         print("   agarrar     - Robot activa brazo para agarrar")
         print("   soltar      - Robot suelta objeto")
         print("   velocidad X - Cambia velocidad (0-255)")
-        print("   robots      - Muestra robots conectados")
+        print("   robots      - Muestra robots conectados y latencia de entrega")
         print("   ayuda       - Muestra esta ayuda")
         print("   salir       - Cierra el servidor")
     
@@ -266,9 +415,14 @@ class ServidorControlManual:
         """Detiene el servidor"""
         print("\n🛑 Deteniendo servidor...")
         self.running = False
+        if self.despertador:
+            self.despertar()
+        if self.io_thread and self.io_thread is not threading.current_thread():
+            self.io_thread.join(timeout=2.0)
         
         # Cerrar todas las conexiones de robots
-        for robot_id, robot_info in self.robots_conectados.items():
+        for robot_id, robot_info in list(self.robots_conectados.items()):
+            robot_info['cola'].cerrar()
             try:
                 robot_info['socket'].close()
             except:
@@ -281,13 +435,26 @@ class ServidorControlManual:
                 self.socket.close()
             except:
                 pass
+
+        if self.selector:
+            self.selector.close()
+        for extremo in self.despertador or ():
+            extremo.close()
         
         print("✅ Servidor detenido correctamente")
 
 # Ejecutar servidor
 if __name__ == "__main__":
+    # --log=DEBUG: muestra también cada comando entregado
+    configurar_registro(nivel_desde_argv(sys.argv))
     print("🚀 Iniciando Servidor de Control Manual...")
     servidor = ServidorControlManual()
+    # --transporte=unix:///tmp/robot.sock: escucha por otro transporte
+    servidor.direccion = next((a.split("=", 1)[1] for a in sys.argv[1:] if a.startswith("--transporte=")), None)
+    # --metricas-http=PUERTO: endpoint /metrics para Prometheus
+    puerto_metricas = next((int(a.split("=", 1)[1]) for a in sys.argv[1:] if a.startswith("--metricas-http=")), 0)
+    if puerto_metricas:
+        ExportadorMetricas(servidor.metricas_prometheus, puerto=puerto_metricas).iniciar()
     
     try:
         servidor.iniciar_servidor()
@@ -0,0 +1,212 @@
+import asyncio
+import itertools
+import time
+
+import transporte
+from registro import log
+from tramas import DecodificadorTramas
+
+
+class ConexionAsync:
+    """Adaptador con interfaz de socket sobre un StreamWriter de asyncio"""
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    def send(self, data):
+        # write() nunca bloquea: los bytes quedan en el buffer del transporte
+        self.writer.write(data)
+        return len(data)
+
+    def sendall(self, data):
+        self.writer.write(data)
+
+    def shutdown(self, how=None):
+        # El lector recibe EOF al cerrarse el transporte
+        self.writer.close()
+
+    def close(self):
+        self.writer.close()
+
+
+class ServidorAsync:
+    """Ejecuta las sesiones de un ServidorRobotRecolector sobre un único event loop"""
+
+    def __init__(self, servidor):
+        self.servidor = servidor
+        self.server = None
+        self.segador = None
+        self._contador = itertools.count(1)
+        # Tareas de las sesiones abiertas, para cancelarlas al detener el loop
+        self.sesiones = set()
+        # Ráfaga de accept en curso: [conexiones, aceptadas, inicio]
+        self._rafaga = None
+
+    async def ejecutar(self):
+        """Abre el puerto y atiende robots hasta que se detenga el servidor"""
+        esquema, destino = transporte.parsear_direccion(self.servidor.direccion_escucha())
+        if esquema == "tcp":
+            self.server = await asyncio.start_server(
+                self.aceptar_robot,
+                destino[0],
+                destino[1],
+                reuse_address=True,
+                reuse_port=self.servidor.reuse_port,
+                backlog=self.servidor.backlog
+            )
+        elif esquema == "unix":
+            self.server = await asyncio.start_unix_server(
+                self.aceptar_robot, destino, backlog=self.servidor.backlog
+            )
+        else:
+            raise OSError(f"El modo asyncio no admite el transporte {esquema}://")
+        self.servidor.running = True
+        self.servidor.mostrar_banner()
+
+        if self.servidor.tiempo_inactividad:
+            self.segador = asyncio.create_task(self.vigilar_inactividad())
+
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            # Ctrl-C: asyncio.run cancela esta tarea; las sesiones se cierran
+            # aquí, con el loop vivo, antes de que llegue a detener_servidor
+            await self.cerrar_sesiones()
+
+    async def cerrar_sesiones(self):
+        """Deja de aceptar, cancela el segador y espera a que cada sesión se finalice"""
+        self.server.close()
+        if self.segador is not None:
+            self.segador.cancel()
+        sesiones = list(self.sesiones)
+        for tarea in sesiones:
+            tarea.cancel()
+        await asyncio.gather(*sesiones, return_exceptions=True)
+        # Una tarea cancelada antes de su primer paso no llega a ejecutar su finally
+        for robot_id, conexion in self.servidor.clientes.items():
+            self.servidor.finalizar_sesion(conexion, robot_id)
+
+    async def vigilar_inactividad(self):
+        """Segador de sesiones inactivas dentro del event loop (sin hilos)"""
+        servidor = self.servidor
+        while servidor.running:
+            await asyncio.sleep(max(1.0, servidor.tiempo_inactividad / 4))
+            servidor.segar_sesiones_inactivas()
+
+    def anotar_admision(self, aceptada):
+        """Cuenta la conexión en la ráfaga de esta vuelta del event loop
+
+        asyncio acepta todo lo pendiente en el listener de una vez y arranca las
+        corrutinas en la misma vuelta del loop: esas conexiones forman la ráfaga
+        que se pasa a registrar_rafaga(), igual que aceptar_rafaga() en hilos.
+        """
+        if self._rafaga is None:
+            self._rafaga = [0, 0, time.perf_counter()]
+            asyncio.get_running_loop().call_soon(self.cerrar_rafaga)
+        self._rafaga[0] += 1
+        self._rafaga[1] += aceptada
+
+    def cerrar_rafaga(self):
+        conexiones, aceptadas, inicio = self._rafaga
+        self._rafaga = None
+        self.servidor.metricas.registrar_rafaga(conexiones, aceptadas, time.perf_counter() - inicio)
+
+    async def recibir_datos_camara(self, reader, conexion, robot_id, decodificador):
+        """Espera hasta tener una trama completa de la cámara"""
+        metricas = self.servidor.metricas.robot(robot_id)
+        tamaño_lectura = 65536 if self.servidor.solo_ultimo_frame else 4096
+        while True:
+            trama = decodificador.siguiente()
+            while trama is None:
+                data = await reader.read(tamaño_lectura)
+                if not data:
+                    return None
+                metricas.bytes_entrada += len(data)
+                decodificador.alimentar(data)
+                trama = decodificador.siguiente()
+
+            if self.servidor.solo_ultimo_frame:
+                # StreamReader no tiene lectura sin espera: read() ya trajo todo lo
+                # acumulado en su buffer, así que basta quedarse con la última trama
+                trama = self.servidor.ultima_trama(decodificador, robot_id, trama)
+
+            inicio = time.perf_counter()
+            datos_camara = self.servidor.interpretar_trama(trama, conexion, robot_id, decodificador)
+            metricas.decodificacion.observar(time.perf_counter() - inicio)
+            if datos_camara is not None:
+                return datos_camara
+
+    def aceptar_robot(self, reader, writer):
+        """Callback de start_server: admite la conexión y arranca su sesión
+
+        No es una corrutina a propósito: la tarea de la sesión la crea y la
+        cancela este servidor (ver cerrar_sesiones). Las que crea asyncio para
+        un callback corrutina tratan la cancelación como un error y la vuelcan
+        con traceback (Python 3.11).
+        """
+        servidor = self.servidor
+        address = writer.get_extra_info("peername")
+        if isinstance(address, tuple):
+            robot_id = f"{address[0]}:{address[1]}"
+        else:
+            robot_id = f"unix:{next(self._contador)}"
+
+        if servidor.maximo_sesiones and len(servidor.clientes) >= servidor.maximo_sesiones:
+            transporte.linger_cero(writer.get_extra_info("socket"))
+            writer.transport.abort()
+            self.anotar_admision(False)
+            log.warning("⛔ [%s] Rechazado: %d sesiones activas (máximo)", robot_id, servidor.maximo_sesiones)
+            return
+
+        self.anotar_admision(True)
+        # Se registra ya: las demás conexiones de la ráfaga cuentan con esta sesión
+        conexion = ConexionAsync(writer)
+        servidor.clientes[robot_id] = conexion
+        tarea = asyncio.get_running_loop().create_task(self.manejar_robot(reader, conexion, robot_id))
+        self.sesiones.add(tarea)
+        tarea.add_done_callback(self.sesiones.discard)
+
+    async def manejar_robot(self, reader, conexion, robot_id):
+        """Corrutina equivalente a ServidorRobotRecolector.manejar_robot"""
+        servidor = self.servidor
+        writer = conexion.writer
+        if servidor.keepalive:
+            transporte.configurar_keepalive(writer.get_extra_info("socket"), *servidor.keepalive)
+
+        log.info("✅ Robot conectado: %s", robot_id)
+        log.info("🤖 [%s] Iniciando sesión de control", robot_id)
+        servidor.inicializar_estado_robot(robot_id)
+        decodificador = DecodificadorTramas(servidor.modo_tramas)
+        planificador = servidor.crear_planificador(robot_id)
+
+        try:
+            while servidor.running:
+                # Recibir datos de la cámara
+                try:
+                    datos_camara = await self.recibir_datos_camara(
+                        reader, conexion, robot_id, decodificador
+                    )
+                except (ConnectionError, UnicodeDecodeError) as e:
+                    log.error("❌ Error recibiendo datos de cámara: %s", e)
+                    datos_camara = None
+
+                if datos_camara is None:
+                    log.warning("⚠️ [%s] Conexión perdida", robot_id)
+                    break
+
+                planificador.marcar_inicio()
+                if not servidor.procesar_tick(conexion, robot_id, datos_camara):
+                    break
+                await writer.drain()
+
+                # Esperar solo lo que quede hasta el próximo deadline
+                await planificador.esperar_async()
+
+        except asyncio.CancelledError:
+            # Servidor deteniéndose: finally cierra la sesión y la cancelación sigue
+            raise
+        except Exception as e:
+            log.error("❌ [%s] Error en sesión: %s", robot_id, e)
+        finally:
+            servidor.finalizar_sesion(conexion, robot_id)
@@ -0,0 +1,545 @@
+"""Base común de server.py y serverz.py
+
+Sesiones, transporte, admisión, segador de inactivos, métricas y línea de
+comandos viven aquí; cada servidor solo define su codificación de comandos y,
+en serverz.py, la gestión de velocidades.
+"""
+import asyncio
+import json
+import logging
+import socket
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+import transporte
+from almacen_estados import AlmacenEstados
+from estado_robot import EstadoRobot
+from exportador_metricas import ExportadorMetricas, metricas_servidor, ocupacion_estados
+from metricas import MetricasServidor
+from planificador import PlanificadorCiclo
+from protocolo_binario import FRAME, RESPUESTA_SALUDO, SALUDO_BINARIO, decodificar_frame
+from registro import configurar_registro, log, log_tick, nivel_desde_argv
+from tramas import DecodificadorTramas
+
+
+class ServidorBase(ABC):
+    """Todo lo que no depende del firmware del robot"""
+
+    def __init__(self, host='0.0.0.0', port=1234):
+        self.host = host
+        self.port = port
+        # Transporte: None = tcp://host:port; también unix:///ruta o memoria://nombre
+        self.direccion = None
+        self.socket = None
+        self.running = False
+        self.clientes = AlmacenEstados()
+
+        # Delimitación de mensajes de cámara: "json", "linea" o "longitud"
+        self.modo_tramas = "json"
+
+        # Frecuencia del bucle de control (Hz); 0 = tan rápido como lleguen frames
+        self.frecuencia_control = 10
+        # Frecuencias específicas por robot ("ip:puerto" o solo "ip")
+        self.frecuencias_robot = {}
+
+        # Si el robot envía más frames de los que se procesan, decidir solo con el
+        # más reciente y descartar los atrasados (ver ultima_trama)
+        self.solo_ultimo_frame = False
+
+        # Robots que desaparecen sin cerrar (p. ej. un ESP32 sin alimentación):
+        # keepalive TCP (inactividad s, intervalo s, sondas) y cierre de las
+        # sesiones sin frames durante tiempo_inactividad segundos (0 = nunca)
+        self.keepalive = (10, 5, 3)
+        self.tiempo_inactividad = 60.0
+
+        # Admisión: cola de conexiones pendientes del kernel y máximo de sesiones
+        # simultáneas (0 = sin límite); las que sobran se rechazan con RST
+        self.backlog = 128
+        self.maximo_sesiones = 0
+
+        # SO_REUSEPORT: varios procesos (ver supervisor.py) comparten el puerto
+        self.reuse_port = False
+
+        # Estados del robot (almacén con un lock por shard, compartido entre hilos)
+        self.estados_robot = AlmacenEstados()
+
+        # Objetos reconocidos
+        self.objetos_validos = [
+            "cuadrado",
+            "cilindro"
+        ]
+
+        # Destinos reconocidos (donde dejar objetos cuadrado)
+        self.destinos_validos_cuadrado = [
+            "contenedor_cuadrado",
+        ]
+        # Destinos reconocidos (donde dejar objetos cilindro)
+        self.destinos_validos_cilindro = [
+            "contenedor_cilindro",
+        ]
+
+        # Tiempos por fase, frames/s y bytes por robot (ver instantanea())
+        self.metricas = MetricasServidor()
+
+        # Grabación opcional de frames y comandos (GrabadorSesiones, ver reproductor.py)
+        self.grabador = None
+
+    def iniciar_servidor(self):
+        """Inicia el servidor (TCP, socket Unix o canal en memoria según self.direccion)"""
+        try:
+            self.socket = transporte.escuchar(self.direccion_escucha(), backlog=self.backlog, reuse_port=self.reuse_port)
+            self.running = True
+
+            self.mostrar_banner()
+
+            if self.tiempo_inactividad:
+                segador_thread = threading.Thread(target=self.vigilar_inactividad)
+                segador_thread.daemon = True
+                segador_thread.start()
+
+            while self.running:
+                try:
+                    # Tras una caída de Wi-Fi reconecta toda la flota a la vez:
+                    # se vacía la cola del kernel en ráfagas en vez de una a una
+                    conexiones = self.socket.aceptar_rafaga()
+                    self.admitir_conexiones(conexiones)
+
+                except Exception as e:
+                    if self.running:
+                        log.error("❌ Error aceptando conexión: %s", e)
+
+        except Exception as e:
+            log.error("❌ Error iniciando servidor: %s", e)
+
+    def admitir_conexiones(self, conexiones):
+        """Arranca las sesiones de una ráfaga de accept; rechaza las que superan maximo_sesiones"""
+        inicio = time.perf_counter()
+        aceptadas = 0
+        for client_socket, client_id in conexiones:
+            if self.maximo_sesiones and len(self.clientes) >= self.maximo_sesiones:
+                transporte.cerrar_con_rst(client_socket)
+                log.warning("⛔ [%s] Rechazado: %d sesiones activas (máximo)", client_id, self.maximo_sesiones)
+                continue
+
+            self.clientes[client_id] = client_socket
+            if self.keepalive:
+                transporte.configurar_keepalive(client_socket, *self.keepalive)
+
+            log.info("✅ Robot conectado: %s", client_id)
+
+            # Crear hilo para manejar este robot
+            client_thread = threading.Thread(
+                target=self.manejar_robot,
+                args=(client_socket, client_id)
+            )
+            client_thread.daemon = True
+            client_thread.start()
+            aceptadas += 1
+
+        self.metricas.registrar_rafaga(len(conexiones), aceptadas, time.perf_counter() - inicio)
+
+    def direccion_escucha(self):
+        return self.direccion or f"tcp://{self.host}:{self.port}"
+
+    def iniciar_servidor_async(self):
+        """Inicia el servidor en modo asyncio (todas las sesiones en un solo hilo)"""
+        from servidor_async import ServidorAsync
+
+        try:
+            asyncio.run(ServidorAsync(self).ejecutar())
+        except OSError as e:
+            log.error("❌ Error iniciando servidor: %s", e)
+
+    def mostrar_banner(self):
+        """Muestra la configuración del servidor al arrancar"""
+        print("=" * 60)
+        print("🤖 SERVIDOR ROBOT RECOLECTOR INICIADO")
+        print("=" * 60)
+        print(f"📡 Escuchando en: {self.direccion_escucha()}")
+        print(f"🕐 Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"📏 Tamaño mínimo objeto: {self.tamaño_minimo} píxeles")
+        print(f"📏 Tamaño máximo (muy cerca): {self.tamaño_maximo} píxeles")
+        self.mostrar_configuracion()
+        print("\n🔄 Estados del robot:")
+        print("   1. BUSCAR_OBJETO → Busca objetos para recolectar")
+        print("   2. IR_AL_OBJETO → Se acerca al objeto detectado")
+        print("   3. RECOGER → Recoge el objeto cuando está cerca")
+        print("   4. BUSCAR_DESTINO → Busca dónde dejar el objeto")
+        print("   5. IR_A_DESTINO → Va hacia el destino")
+        print("   6. DEJAR_OBJETO → Suelta el objeto en el destino")
+        print("\n⏳ Esperando conexiones...")
+
+    def mostrar_configuracion(self):
+        """Parte del banner propia de cada servidor"""
+
+    def recibir_datos_camara(self, client_socket, decodificador, robot_id):
+        """Recibe datos de la cámara del robot (una trama completa por llamada)"""
+        metricas = self.metricas.robot(robot_id)
+        try:
+            while True:
+                trama = decodificador.siguiente()
+                while trama is None:
+                    leidos = decodificador.recibir_desde(client_socket)
+                    if not leidos:
+                        return None
+                    metricas.bytes_entrada += leidos
+                    trama = decodificador.siguiente()
+
+                if self.solo_ultimo_frame:
+                    trama = self.ultima_trama(decodificador, robot_id, trama, client_socket)
+
+                inicio = time.perf_counter()
+                datos_camara = self.interpretar_trama(trama, client_socket, robot_id, decodificador)
+                metricas.decodificacion.observar(time.perf_counter() - inicio)
+                if datos_camara is not None:
+                    return datos_camara
+        except Exception as e:
+            log.error("❌ Error recibiendo datos de cámara: %s", e)
+            return None
+
+    def ultima_trama(self, decodificador, robot_id, trama, client_socket=None):
+        """Vacía lo ya recibido (sin bloquear) y devuelve la trama más reciente
+
+        Las tramas reemplazadas se cuentan en frames_descartados. El saludo del
+        protocolo binario nunca se descarta: se devuelve en cuanto aparece.
+        """
+        metricas = self.metricas.robot(robot_id)
+        while True:
+            if decodificador.modo != "fijo" and trama == SALUDO_BINARIO:
+                return trama
+
+            leidos = 0
+            if client_socket is not None:
+                try:
+                    leidos = decodificador.recibir_desde(client_socket, socket.MSG_DONTWAIT)
+                except BlockingIOError:
+                    pass
+                metricas.bytes_entrada += leidos
+
+            nueva = decodificador.siguiente()
+            if nueva is not None:
+                metricas.frames_descartados += 1
+                trama = nueva
+            elif not leidos:
+                # Nada más pendiente (un cierre lo detectará el próximo recv)
+                return trama
+
+    def interpretar_trama(self, trama, client_socket, robot_id, decodificador):
+        """Convierte una trama en datos de cámara; None si era el saludo del protocolo binario"""
+        if decodificador.modo == "fijo":
+            return decodificar_frame(trama)
+
+        if trama == SALUDO_BINARIO:
+            # El robot pide el protocolo binario: desde aquí frames de tamaño fijo
+            decodificador.cambiar_modo("fijo", FRAME.size)
+            self.estados_robot[robot_id].protocolo = "binario"
+            client_socket.sendall(RESPUESTA_SALUDO)
+            log.info("⚡ [%s] Protocolo binario activado", robot_id)
+            return None
+
+        return self.decodificar_datos_camara(trama)
+
+    def decodificar_datos_camara(self, data):
+        """Convierte una trama recibida de la cámara en un diccionario"""
+        data = data.decode('utf-8').strip()
+
+        log_tick.debug("📥 Trama recibida: %s", data)
+        if not data:
+            return None
+
+        try:
+            datos_camara = json.loads(data)
+            return datos_camara
+        except json.JSONDecodeError:
+            # Si no es JSON, intentar parsear como texto simple
+            return {"objeto": data.lower(), "tamaño": 0}
+
+    def inicializar_estado_robot(self, robot_id):
+        """Inicializa el estado de un nuevo robot"""
+        self.estados_robot[robot_id] = EstadoRobot()
+        if self.grabador is not None:
+            self.grabador.inicio(robot_id)
+        log.info("🔄 [%s] Estado inicial: BUSCAR_OBJETO", robot_id)
+
+    def nuevo_lote(self):
+        """Acumulador de los comandos extra de un tick (None si el servidor no los usa)"""
+        return None
+
+    def aplicar_velocidad(self, lote, velocidad, estado_robot, robot_id):
+        """Perfil de velocidad pedido por la máquina de estados (solo serverz.py lo usa)"""
+
+    def procesar_datos_y_estado(self, datos_camara, robot_id, lote=None):
+        """Procesa los datos de la cámara según el estado actual del robot"""
+        estado_robot = self.estados_robot.get(robot_id)
+        if estado_robot is None:
+            self.inicializar_estado_robot(robot_id)
+            estado_robot = self.estados_robot[robot_id]
+
+        if log_tick.isEnabledFor(logging.DEBUG):
+            log_tick.debug("🔍 [%s] Estado: %s", robot_id, estado_robot.estado_actual.name)
+            if datos_camara.get("objeto"):
+                log_tick.debug("👁️ [%s] Ve: %s (tamaño: %s)", robot_id,
+                               datos_camara["objeto"].upper(), datos_camara.get("tamaño", 0))
+
+        # Bajo el lock del shard: una instantánea nunca ve el estado a medio tick
+        with self.estados_robot.bloqueo(robot_id):
+            estado_robot.secuencia = datos_camara.get("secuencia", 0)
+
+            # Una búsqueda en la tabla de transiciones + evaluación de guardas
+            comando, velocidad = self.maquina.paso(datos_camara, estado_robot, robot_id)
+
+            if velocidad is not None:
+                self.aplicar_velocidad(lote, velocidad, estado_robot, robot_id)
+
+            estado_robot.ultimo_comando = comando
+            estado_robot.contador_movimientos += 1
+
+        return comando
+
+    @abstractmethod
+    def enviar_comando(self, client_socket, comando, robot_id, lote=None):
+        """Codifica y envía el comando del tick (propio de cada servidor); False si falló el envío"""
+
+    def procesar_tick(self, client_socket, robot_id, datos_camara):
+        """Decide y envía el comando para un frame de cámara; False si hay que cerrar la sesión"""
+        lote = self.nuevo_lote()
+        metricas = self.metricas.robot(robot_id)
+        metricas.frames += 1
+        metricas.ultima_actividad = time.monotonic()
+        if metricas.frames == 1:
+            # El primer frame dice qué robot es (los clientes envían "robot_id")
+            self.metricas.identificar(robot_id, datos_camara.get("robot_id"))
+
+        # Antes de decidir: si el frame abre un archivo rotado, el ESTADO grabado es el previo
+        if self.grabador is not None:
+            self.grabador.frame(robot_id, datos_camara)
+
+        # Procesar datos y obtener comando
+        inicio = time.perf_counter()
+        comando = self.procesar_datos_y_estado(datos_camara, robot_id, lote)
+        decidido = time.perf_counter()
+        metricas.decision.observar(decidido - inicio)
+        metricas.comandos[comando] = metricas.comandos.get(comando, 0) + 1
+
+        if self.grabador is not None:
+            self.grabador.comando(robot_id, comando)
+
+        # Enviar comando al robot
+        enviado = self.enviar_comando(client_socket, comando, robot_id, lote)
+        metricas.envio.observar(time.perf_counter() - decidido)
+        if not enviado:
+            return False
+
+        # Mostrar estado actual
+        if log_tick.isEnabledFor(logging.DEBUG):
+            estado = self.estados_robot[robot_id]
+            log_tick.debug("📊 [%s] Estado: %s | Objeto: %s | Velocidad: %s | Movimientos: %s",
+                           robot_id, estado.estado_actual.name,
+                           "✅" if estado.tiene_objeto else "❌",
+                           estado.velocidad_actual or "No configurada",
+                           estado.contador_movimientos)
+        return True
+
+    def manejar_robot(self, client_socket, robot_id):
+        """Maneja la comunicación con un robot específico"""
+        log.info("🤖 [%s] Iniciando sesión de control", robot_id)
+        self.inicializar_estado_robot(robot_id)
+        decodificador = DecodificadorTramas(self.modo_tramas)
+        planificador = self.crear_planificador(robot_id)
+
+        try:
+            while self.running:
+                # Recibir datos de la cámara
+                datos_camara = self.recibir_datos_camara(client_socket, decodificador, robot_id)
+
+                if datos_camara is None:
+                    log.warning("⚠️ [%s] Conexión perdida", robot_id)
+                    break
+
+                planificador.marcar_inicio()
+                if not self.procesar_tick(client_socket, robot_id, datos_camara):
+                    break
+
+                # Esperar solo lo que quede hasta el próximo deadline
+                planificador.esperar()
+
+        except Exception as e:
+            log.error("❌ [%s] Error en sesión: %s", robot_id, e)
+        finally:
+            self.finalizar_sesion(client_socket, robot_id)
+
+    def vigilar_inactividad(self):
+        """Hilo segador: revisa periódicamente las sesiones inactivas"""
+        while self.running:
+            time.sleep(max(1.0, self.tiempo_inactividad / 4))
+            self.segar_sesiones_inactivas()
+
+    def segar_sesiones_inactivas(self):
+        """Corta las sesiones sin frames desde hace tiempo_inactividad; devuelve cuántas
+
+        Solo hace shutdown del socket: el hilo o la corrutina del robot sale de
+        recv() y finalizar_sesion() libera socket, estado y métricas.
+        """
+        limite = time.monotonic() - self.tiempo_inactividad
+        cortadas = 0
+        for robot_id in self.metricas.inactivos(limite):
+            conexion = self.clientes.get(robot_id)
+            if conexion is None:
+                continue
+            log.warning("💀 [%s] Sin frames desde hace más de %.0f s: cerrando sesión",
+                        robot_id, self.tiempo_inactividad)
+            try:
+                conexion.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            cortadas += 1
+        return cortadas
+
+    def crear_planificador(self, robot_id):
+        """Crea el planificador de ticks con la frecuencia configurada para el robot"""
+        ip = robot_id.rsplit(":", 1)[0]
+        frecuencia = self.frecuencias_robot.get(
+            robot_id, self.frecuencias_robot.get(ip, self.frecuencia_control)
+        )
+        return PlanificadorCiclo(frecuencia, robot_id, self.metricas.robot(robot_id))
+
+    def finalizar_sesion(self, client_socket, robot_id):
+        """Libera el socket y el estado de un robot desconectado"""
+        self.clientes.pop(robot_id)
+        self.estados_robot.pop(robot_id)
+        self.metricas.retirar(robot_id)
+
+        client_socket.close()
+        log.info("🔌 [%s] Robot desconectado", robot_id)
+
+    def detener_servidor(self):
+        """Detiene el servidor"""
+        print("\n🛑 Deteniendo servidor...")
+        self.running = False
+
+        # Cerrar todas las conexiones (items() es una copia: los hilos pueden ir borrando)
+        for client_id, client_socket in self.clientes.items():
+            try:
+                client_socket.close()
+            except OSError:
+                pass
+
+        if self.socket:
+            self.socket.close()
+
+        if self.grabador is not None:
+            self.grabador.cerrar()
+
+        self.mostrar_metricas()
+        print("✅ Servidor detenido correctamente")
+
+    def metricas_prometheus(self):
+        """Texto del endpoint /metrics (ver exportador_metricas.py)"""
+        return metricas_servidor(self)
+
+    def mostrar_metricas(self):
+        """Resume las métricas agregadas de la sesión"""
+        instantanea = self.metricas.instantanea()
+        agregado = instantanea["agregado"]
+        print(f"📈 Frames: {agregado['frames']} ({agregado['frames_por_s']}/s) | "
+              f"Bytes: {agregado['bytes_entrada']} in / {agregado['bytes_salida']} out")
+        conexiones = instantanea["conexiones"]
+        print(f"🔗 Conexiones: {conexiones['aceptadas']} aceptadas / {conexiones['rechazadas']} rechazadas | "
+              f"ráfaga máxima: {conexiones['rafaga_maxima']}")
+        ocupacion = ocupacion_estados(self.estados_robot)
+        if ocupacion:
+            print("🔄 Robots por estado: " + ", ".join(f"{nombre}={cuenta}" for nombre, cuenta in sorted(ocupacion.items())))
+        if agregado['frames_descartados']:
+            print(f"🗑️ Frames atrasados descartados: {agregado['frames_descartados']}")
+        if agregado['comandos_omitidos']:
+            print(f"🔇 Comandos omitidos (sin cambios en actuadores): {agregado['comandos_omitidos']}")
+        retraso = agregado['retraso']
+        if retraso['cuenta']:
+            print(f"⏰ Ticks fuera de plazo: {retraso['cuenta']} | "
+                  f"retraso p99={retraso['p99_ms']}ms max={retraso['max_ms']}ms")
+        for fase in ("decodificacion", "decision", "envio"):
+            h = agregado[fase]
+            print(f"⏱️ {fase}: p50={h['p50_ms']}ms p99={h['p99_ms']}ms max={h['max_ms']}ms")
+
+    def aplicar_argumento(self, arg):
+        """Aplica una opción de línea de comandos; False si no es de este servidor
+
+        --hz=F --tramas=MODO --transporte=unix:///tmp/robot.sock --grabar=DIR
+        --backlog=N --max-sesiones=M: cola de accept del kernel y límite de sesiones
+        --inactividad=S: cerrar sesiones sin frames durante S segundos (0 = nunca)
+        --keepalive=IDLE,INTERVALO,SONDAS: keepalive TCP de los sockets de robots
+        --ultimo-frame: si llegan frames más rápido de lo que se procesan, usar solo el último
+        """
+        clave, _, valor = arg.partition("=")
+        if clave == "--hz":
+            self.frecuencia_control = float(valor)
+        elif clave == "--tramas":
+            self.modo_tramas = valor
+        elif clave == "--transporte":
+            self.direccion = valor
+        elif clave == "--grabar":
+            from grabador import GrabadorSesiones
+            self.grabador = GrabadorSesiones(valor, estados=self.estados_robot)
+        elif clave == "--backlog":
+            self.backlog = int(valor)
+        elif clave == "--max-sesiones":
+            self.maximo_sesiones = int(valor)
+        elif clave == "--inactividad":
+            self.tiempo_inactividad = float(valor)
+        elif clave == "--keepalive":
+            self.keepalive = tuple(int(v) for v in valor.split(","))
+        elif arg == "--ultimo-frame":
+            self.solo_ultimo_frame = True
+        else:
+            return False
+        return True
+
+
+def ejecutar_desde_consola(clase, argv=None):
+    """Punto de entrada de server.py y serverz.py
+
+    --async: todas las sesiones multiplexadas en un único event loop
+    --procesos=K: K procesos worker en el mismo puerto (SO_REUSEPORT)
+    --metricas-http=PUERTO: endpoint /metrics para Prometheus
+    --log=NIVEL y el resto de opciones de ServidorBase.aplicar_argumento;
+    una opción que nadie reconoce detiene el arranque
+    """
+    argv = sys.argv if argv is None else argv
+    configurar_registro(nivel_desde_argv(argv))
+    print("🚀 Iniciando Servidor Robot Recolector...")
+    servidor = clase()
+
+    try:
+        procesos = 0
+        puerto_metricas = None
+        for arg in argv[1:]:
+            if arg.startswith("--procesos="):
+                procesos = int(arg.split("=", 1)[1])
+            elif arg.startswith("--metricas-http="):
+                puerto_metricas = int(arg.split("=", 1)[1])
+            elif arg == "--async" or arg.startswith("--log="):
+                pass  # ya leídas arriba y al elegir el modo
+            elif not servidor.aplicar_argumento(arg):
+                raise SystemExit(f"❌ Opción desconocida: {arg}")
+
+        if procesos:
+            from supervisor import Supervisor
+            supervisor = Supervisor(servidor, procesos, "--async" in argv,
+                                    nivel_log=nivel_desde_argv(argv), puerto_metricas=puerto_metricas)
+            supervisor.ejecutar()
+        else:
+            if puerto_metricas:
+                ExportadorMetricas(servidor.metricas_prometheus, puerto=puerto_metricas).iniciar()
+            if "--async" in argv:
+                servidor.iniciar_servidor_async()
+            else:
+                servidor.iniciar_servidor()
+    except KeyboardInterrupt:
+        print("\n\n⚠️ Interrupción detectada...")
+        servidor.detener_servidor()
+    except Exception as e:
+        print(f"\n❌ Error crítico: {e}")
+        servidor.detener_servidor()
@@ -0,0 +1,329 @@
+"""Simulador por lotes de la máquina de estados del recolector con NumPy
+
+Mantiene el estado de N robots virtuales en arrays y los avanza todos a la vez
+contra un mundo sintético (objeto/contenedor a cierta distancia, tamaño
+aparente ~ 1/d², pérdidas de detección y giros de búsqueda). Las reglas son
+las de maquina_estados.ESPECIFICACION con el vocabulario de server.py; sirve
+para ajustar tamaño_minimo, tamaño_maximo y los límites de búsqueda mirando
+estadísticas de ciclos de recogida en segundos.
+
+Requiere NumPy (pip install numpy); el resto del proyecto no lo necesita.
+
+Ejemplos:
+    python simulador_vectorizado.py --robots 100000 --pasos 3000
+    python simulador_vectorizado.py --tamaño-minimo 30 50 100 --tamaño-maximo 150 200 300
+"""
+import argparse
+import itertools
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from maquina_estados import (
+    LIMITE_AVANCE_OBJETO, LIMITE_EXPLORACION_DESTINO, LIMITE_GIRO_DESTINO, LIMITE_GIRO_OBJETO,
+    Estado
+)
+from protocolo_binario import ID_CLASE, ID_ESTADO, OPCODE, OPCODES
+
+# Códigos compartidos con el protocolo binario
+BUSCAR_OBJETO = ID_ESTADO[Estado.BUSCAR_OBJETO]
+IR_AL_OBJETO = ID_ESTADO[Estado.IR_AL_OBJETO]
+RECOGER = ID_ESTADO[Estado.RECOGER]
+BUSCAR_DESTINO = ID_ESTADO[Estado.BUSCAR_DESTINO]
+IR_A_DESTINO = ID_ESTADO[Estado.IR_A_DESTINO]
+DEJAR_OBJETO = ID_ESTADO[Estado.DEJAR_OBJETO]
+
+NADA = ID_CLASE[""]
+CUADRADO = ID_CLASE["cuadrado"]
+CILINDRO = ID_CLASE["cilindro"]
+CONTENEDOR_CUADRADO = ID_CLASE["contenedor_cuadrado"]
+CONTENEDOR_CILINDRO = ID_CLASE["contenedor_cilindro"]
+
+AVANZAR = OPCODE["AVANZAR"]
+AVANZAR_LENTO = OPCODE["AVANZAR_LENTO"]
+GIRAR_DERECHA = OPCODE["GIRAR_DERECHA"]
+GIRAR_IZQUIERDA = OPCODE["GIRAR_IZQUIERDA"]
+PARAR = OPCODE["PARAR"]
+OP_RECOGER = OPCODE["RECOGER"]
+SOLTAR = OPCODE["SOLTAR"]
+
+DERECHA = 0
+IZQUIERDA = 1
+
+
+def _requerir_numpy():
+    if np is None:
+        raise SystemExit("❌ simulador_vectorizado.py necesita NumPy: pip install numpy")
+
+
+class SimuladorVectorizado:
+    """Estado de control de N robots en arrays y un paso de decisión vectorizado"""
+
+    def __init__(self, robots, tamaño_minimo=50, tamaño_maximo=200,
+                 limites=(LIMITE_AVANCE_OBJETO, LIMITE_GIRO_OBJETO,
+                          LIMITE_GIRO_DESTINO, LIMITE_EXPLORACION_DESTINO)):
+        _requerir_numpy()
+        self.robots = robots
+        self.tamaño_minimo = tamaño_minimo
+        self.tamaño_maximo = tamaño_maximo
+        self.limite_avance, self.limite_giro, self.limite_giro_destino, self.limite_exploracion = limites
+
+        self.estado = np.full(robots, BUSCAR_OBJETO, dtype=np.uint8)
+        self.objeto = np.zeros(robots, dtype=np.uint8)        # objeto_detectado / en mano
+        self.intentos = np.zeros(robots, dtype=np.int16)
+        self.direccion = np.full(robots, DERECHA, dtype=np.uint8)
+        self.tiene_objeto = np.zeros(robots, dtype=bool)
+
+    def paso(self, objeto, tamaño):
+        """Aplica un frame (clase, tamaño) a cada robot; devuelve el opcode de cada uno"""
+        e = self.estado
+        intentos = self.intentos
+        siguiente = intentos + 1
+
+        valido = (objeto == CUADRADO) | (objeto == CILINDRO)
+        lejos = tamaño < self.tamaño_minimo
+        cerca = tamaño >= self.tamaño_maximo
+        destino_ok = (((self.objeto == CUADRADO) & (objeto == CONTENEDOR_CUADRADO))
+                      | ((self.objeto == CILINDRO) & (objeto == CONTENEDOR_CILINDRO)))
+        giro = np.where(self.direccion == DERECHA, GIRAR_DERECHA, GIRAR_IZQUIERDA).astype(np.uint8)
+
+        comando = np.full(self.robots, PARAR, dtype=np.uint8)
+        nuevo_estado = e.copy()
+        nuevos_intentos = intentos.copy()
+
+        # BUSCAR_OBJETO
+        buscando = e == BUSCAR_OBJETO
+        visto = buscando & valido & (tamaño > 10)
+        comando[visto] = np.where(lejos[visto], AVANZAR, AVANZAR_LENTO)
+        nuevo_estado[visto] = IR_AL_OBJETO
+        self.objeto[visto] = objeto[visto]
+        nuevos_intentos[visto] = 0
+
+        sin_ver = buscando & ~visto
+        avanza = sin_ver & (siguiente < self.limite_avance)
+        gira = sin_ver & ~avanza & (siguiente < self.limite_giro)
+        invierte = sin_ver & ~avanza & ~gira
+        comando[avanza] = AVANZAR
+        comando[gira] = giro[gira]
+        nuevos_intentos[avanza | gira] += 1
+        # invertir_giro se aplica antes de calcular el comando: gira ya hacia el otro lado
+        self.direccion[invierte] ^= 1
+        comando[invierte] = np.where(self.direccion[invierte] == DERECHA, GIRAR_DERECHA, GIRAR_IZQUIERDA)
+        nuevos_intentos[invierte] = 0
+
+        # IR_AL_OBJETO
+        yendo = e == IR_AL_OBJETO
+        perdido = yendo & ~valido
+        nuevo_estado[perdido] = BUSCAR_OBJETO
+        self.objeto[perdido] = NADA
+        llega = yendo & valido & cerca
+        nuevo_estado[llega] = RECOGER
+        comando[yendo & valido & ~cerca] = np.where(lejos[yendo & valido & ~cerca], AVANZAR, AVANZAR_LENTO)
+
+        # RECOGER
+        recoge = e == RECOGER
+        comando[recoge] = OP_RECOGER
+        nuevo_estado[recoge] = BUSCAR_DESTINO
+        self.tiene_objeto[recoge] = True
+        nuevos_intentos[recoge] = 0
+
+        # BUSCAR_DESTINO
+        buscando_destino = e == BUSCAR_DESTINO
+        destino_visto = buscando_destino & destino_ok & (tamaño > 20)
+        comando[destino_visto] = AVANZAR
+        nuevo_estado[destino_visto] = IR_A_DESTINO
+        nuevos_intentos[destino_visto] = 0
+
+        sin_destino = buscando_destino & ~destino_visto
+        gira_destino = sin_destino & (siguiente < self.limite_giro_destino)
+        explora = sin_destino & ~gira_destino & (siguiente < self.limite_exploracion)
+        reinicia = sin_destino & ~gira_destino & ~explora
+        comando[gira_destino | reinicia] = GIRAR_DERECHA
+        comando[explora] = AVANZAR
+        nuevos_intentos[gira_destino | explora] += 1
+        nuevos_intentos[reinicia] = 0
+
+        # IR_A_DESTINO
+        yendo_destino = e == IR_A_DESTINO
+        nuevo_estado[yendo_destino & ~destino_ok] = BUSCAR_DESTINO
+        nuevo_estado[yendo_destino & destino_ok & cerca] = DEJAR_OBJETO
+        avanzando = yendo_destino & destino_ok & ~cerca
+        comando[avanzando] = np.where(lejos[avanzando], AVANZAR, AVANZAR_LENTO)
+
+        # DEJAR_OBJETO
+        deja = e == DEJAR_OBJETO
+        comando[deja] = SOLTAR
+        nuevo_estado[deja] = BUSCAR_OBJETO
+        self.tiene_objeto[deja] = False
+        self.objeto[deja] = NADA
+        nuevos_intentos[deja] = 0
+
+        self.estado = nuevo_estado
+        self.intentos = nuevos_intentos
+        return comando
+
+
+class MundoSintetico:
+    """Objetos y contenedores a distancia aleatoria; el tamaño aparente crece como 1/d²"""
+
+    def __init__(self, robots, semilla=1, escala=20.0, distancia_objeto=(0.5, 5.0),
+                 distancia_contenedor=(1.0, 8.0), paso=0.10, paso_lento=0.04,
+                 p_alinear_giro=1 / 12, p_alinear_avance=0.02, p_perdida=0.05, p_distractor=0.02):
+        _requerir_numpy()
+        self.robots = robots
+        self.aleatorio = np.random.default_rng(semilla)
+        self.escala = escala
+        self.distancia_objeto = distancia_objeto
+        self.distancia_contenedor = distancia_contenedor
+        self.paso = paso
+        self.paso_lento = paso_lento
+        self.p_alinear_giro = p_alinear_giro
+        self.p_alinear_avance = p_alinear_avance
+        self.p_perdida = p_perdida
+        self.p_distractor = p_distractor
+
+        self.clase = self.aleatorio.integers(CUADRADO, CILINDRO + 1, robots).astype(np.uint8)
+        self.llevando = np.zeros(robots, dtype=bool)
+        self.distancia = self.aleatorio.uniform(*distancia_objeto, robots).astype(np.float32)
+        self.alineado = np.zeros(robots, dtype=bool)
+
+    def detecciones(self):
+        """Frame de cámara de cada robot: (clase, tamaño)"""
+        visible = self.alineado & (self.aleatorio.random(self.robots) >= self.p_perdida)
+        objetivo = np.where(self.llevando, self.clase + 2, self.clase).astype(np.uint8)
+        tamaño = (self.escala / np.square(self.distancia)).astype(np.int32)
+
+        objeto = np.where(visible, objetivo, NADA).astype(np.uint8)
+        tamaño = np.where(visible, tamaño, 0)
+
+        # Falsos positivos: otra clase cualquiera con tamaño pequeño
+        distractor = ~visible & (self.aleatorio.random(self.robots) < self.p_distractor)
+        n = int(distractor.sum())
+        if n:
+            objeto[distractor] = self.aleatorio.integers(CUADRADO, CONTENEDOR_CILINDRO + 1, n)
+            tamaño[distractor] = self.aleatorio.integers(0, self.tamaño_distractor(), n)
+        return objeto, tamaño
+
+    def tamaño_distractor(self):
+        return max(2, int(self.escala / self.distancia_objeto[1] ** 2) * 4)
+
+    def aplicar(self, comando):
+        """Mueve cada robot según su comando"""
+        avanza = comando == AVANZAR
+        lento = comando == AVANZAR_LENTO
+        gira = (comando == GIRAR_DERECHA) | (comando == GIRAR_IZQUIERDA)
+
+        self.distancia[avanza & self.alineado] -= self.paso
+        self.distancia[lento & self.alineado] -= self.paso_lento
+        np.maximum(self.distancia, 0.05, out=self.distancia)
+
+        sorteo = self.aleatorio.random(self.robots)
+        self.alineado[gira] = sorteo[gira] < self.p_alinear_giro
+        encuentra = avanza & ~self.alineado & (sorteo < self.p_alinear_avance)
+        self.alineado[encuentra] = True
+
+        recoge = comando == OP_RECOGER
+        n = int(recoge.sum())
+        if n:
+            self.llevando[recoge] = True
+            self.distancia[recoge] = self.aleatorio.uniform(*self.distancia_contenedor, n)
+            self.alineado[recoge] = False
+
+        suelta = comando == SOLTAR
+        n = int(suelta.sum())
+        if n:
+            self.llevando[suelta] = False
+            self.clase[suelta] = self.aleatorio.integers(CUADRADO, CILINDRO + 1, n)
+            self.distancia[suelta] = self.aleatorio.uniform(*self.distancia_objeto, n)
+            self.alineado[suelta] = False
+        return suelta
+
+
+def simular(robots, pasos, tamaño_minimo, tamaño_maximo, limites, semilla=1):
+    """Corre la simulación y devuelve sus estadísticas"""
+    simulador = SimuladorVectorizado(robots, tamaño_minimo, tamaño_maximo, limites)
+    mundo = MundoSintetico(robots, semilla)
+
+    inicio_ciclo = np.zeros(robots, dtype=np.int32)
+    duraciones = np.zeros(pasos + 1, dtype=np.int64)
+    ocupacion = np.zeros(len(ID_ESTADO) + 1, dtype=np.int64)
+    comandos = np.zeros(len(OPCODES), dtype=np.int64)
+    perdidas = 0
+
+    inicio = time.perf_counter()
+    for paso in range(pasos):
+        ocupacion += np.bincount(simulador.estado, minlength=len(ocupacion))
+        antes = simulador.estado
+        objeto, tamaño = mundo.detecciones()
+        comando = simulador.paso(objeto, tamaño)
+        comandos += np.bincount(comando, minlength=len(comandos))
+        perdidas += int(np.count_nonzero((antes == IR_AL_OBJETO) & (simulador.estado == BUSCAR_OBJETO)))
+
+        completados = mundo.aplicar(comando)
+        if completados.any():
+            np.add.at(duraciones, paso + 1 - inicio_ciclo[completados], 1)
+            inicio_ciclo[completados] = paso + 1
+    duracion = time.perf_counter() - inicio
+
+    ciclos = int(duraciones.sum())
+    return {
+        "ciclos": ciclos,
+        "duraciones": duraciones,
+        "ocupacion": ocupacion / ocupacion.sum(),
+        "comandos": comandos,
+        "perdidas_objeto": perdidas,
+        "segundos": duracion,
+        "pasos_robot_por_s": robots * pasos / duracion,
+    }
+
+
+def percentil_histograma(histograma, p):
+    acumulado = np.cumsum(histograma)
+    if not acumulado[-1]:
+        return 0
+    return int(np.searchsorted(acumulado, p / 100 * acumulado[-1]))
+
+
+def mostrar_resultado(tamaño_minimo, tamaño_maximo, resultado, robots, pasos, hz):
+    duraciones = resultado["duraciones"]
+    ciclos = resultado["ciclos"]
+    media = (duraciones * np.arange(len(duraciones))).sum() / ciclos if ciclos else 0.0
+    horas = pasos / hz / 3600
+    print(f"{tamaño_minimo:>7} {tamaño_maximo:>7} {ciclos:>10} "
+          f"{ciclos / robots / horas:>10.1f} {media / hz:>9.1f} "
+          f"{percentil_histograma(duraciones, 50) / hz:>8.1f} {percentil_histograma(duraciones, 95) / hz:>8.1f} "
+          f"{resultado['perdidas_objeto'] / max(ciclos, 1):>8.2f} "
+          f"{resultado['segundos']:>7.2f} {resultado['pasos_robot_por_s'] / 1e6:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulación vectorizada de la flota recolectora")
+    parser.add_argument("--robots", type=int, default=100000)
+    parser.add_argument("--pasos", type=int, default=2000, help="frames por robot")
+    parser.add_argument("--hz", type=float, default=10.0, help="frames por segundo simulados (para pasar a segundos)")
+    parser.add_argument("--tamaño-minimo", type=int, nargs="+", default=[50])
+    parser.add_argument("--tamaño-maximo", type=int, nargs="+", default=[200])
+    parser.add_argument("--limites", default=f"{LIMITE_AVANCE_OBJETO},{LIMITE_GIRO_OBJETO},"
+                                             f"{LIMITE_GIRO_DESTINO},{LIMITE_EXPLORACION_DESTINO}",
+                        help="avance,giro objeto,giro destino,exploración")
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args()
+    _requerir_numpy()
+
+    limites = tuple(int(x) for x in args.limites.split(","))
+    print(f"🧪 {args.robots} robots × {args.pasos} pasos ({args.pasos / args.hz:.0f}s simulados a {args.hz} Hz), "
+          f"límites {limites}")
+    print(f"{'t_min':>7} {'t_max':>7} {'ciclos':>10} {'ciclos/h':>10} {'media_s':>9} "
+          f"{'p50_s':>8} {'p95_s':>8} {'pérd/cic':>8} {'wall_s':>7} {'Mpasos/s':>8}")
+    for tamaño_minimo, tamaño_maximo in itertools.product(args.tamaño_minimo, args.tamaño_maximo):
+        if tamaño_minimo >= tamaño_maximo:
+            continue
+        resultado = simular(args.robots, args.pasos, tamaño_minimo, tamaño_maximo, limites, args.semilla)
+        mostrar_resultado(tamaño_minimo, tamaño_maximo, resultado, args.robots, args.pasos, args.hz)
+
+
+if __name__ == "__main__":
+    main()
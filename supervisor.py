@@ -0,0 +1,218 @@
+"""Supervisor multiproceso: K workers escuchando en el mismo puerto con SO_REUSEPORT
+
+Cada worker es un proceso con su propio ServidorRobotRecolector (accept, hilos o
+event loop y máquinas de estado); el kernel reparte las conexiones entrantes
+entre ellos. Los workers publican periódicamente sus métricas agregadas, la
+ocupación de estados y sus contadores de conexión, y el supervisor los suma en
+una vista única.
+"""
+import multiprocessing
+import queue
+import socket
+import threading
+import time
+
+import transporte
+from exportador_metricas import (
+    ExportadorMetricas, TextoPrometheus, metricas_agregadas, metricas_sesiones, ocupacion_estados
+)
+from metricas import MetricasRobot
+from registro import configurar_registro, detener_registro, log
+
+# Código de salida de un worker que no llegó a escuchar (p. ej. puerto ocupado):
+# relanzarlo fallaría igual, así que el supervisor se detiene
+CODIGO_SIN_ESCUCHAR = 3
+
+
+def _publicar_metricas(servidor, indice, cola, intervalo):
+    """Hilo del worker: envía al supervisor sus métricas (ver Supervisor.metricas_workers)"""
+    while True:
+        time.sleep(intervalo)
+        metricas = servidor.metricas
+        publicacion = {
+            "conectados": len(metricas.robots),
+            "ocupacion": ocupacion_estados(servidor.estados_robot),
+            "conexiones": metricas.conexiones(),
+            "agregado": metricas.agregado(),
+        }
+        try:
+            cola.put((indice, publicacion))
+        except (OSError, ValueError):
+            return
+
+
+def _ejecutar_worker(servidor, indice, cola, intervalo, asincrono, nivel_log, exportador=None):
+    """Punto de entrada de cada proceso worker"""
+    if exportador is not None:
+        # Relanzado tras arrancar /metrics: el fork copió su socket de escucha
+        exportador.soltar_heredado()
+    configurar_registro(nivel_log)
+    servidor.reuse_port = True
+    threading.Thread(
+        target=_publicar_metricas, args=(servidor, indice, cola, intervalo), daemon=True
+    ).start()
+
+    log.info("👷 Worker %s (pid %s) escuchando en %s",
+             indice, multiprocessing.current_process().pid, servidor.direccion_escucha())
+    try:
+        if asincrono:
+            servidor.iniciar_servidor_async()
+        else:
+            servidor.iniciar_servidor()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # El hijo del fork sale con os._exit: sin esto se pierde el último error
+        detener_registro()
+    # iniciar_servidor solo vuelve si no pudo abrir el punto de escucha
+    if not servidor.running:
+        raise SystemExit(CODIGO_SIN_ESCUCHAR)
+
+
+class Supervisor:
+    """Arranca y vigila K procesos worker de un mismo servidor"""
+
+    def __init__(self, servidor, procesos=None, asincrono=False, intervalo_metricas=5.0, nivel_log=None,
+                 puerto_metricas=None):
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT no está disponible en esta plataforma")
+        esquema, _ = transporte.parsear_direccion(servidor.direccion_escucha())
+        if esquema != "tcp":
+            raise ValueError(f"--procesos necesita un transporte tcp:// (SO_REUSEPORT), no {esquema}://")
+
+        self.servidor = servidor
+        self.procesos = procesos or multiprocessing.cpu_count()
+        self.asincrono = asincrono
+        self.intervalo_metricas = intervalo_metricas
+        self.nivel_log = nivel_log
+        # /metrics se abre después de lanzar los workers para que no hereden el socket
+        self.puerto_metricas = puerto_metricas
+        self.exportador = None
+
+        # fork: los workers heredan la configuración del servidor ya preparada
+        self.contexto = multiprocessing.get_context("fork")
+        self.cola_metricas = self.contexto.Queue()
+        self.workers = {}
+        # Última publicación de cada worker: conectados, ocupacion, conexiones y agregado
+        self.metricas_workers = {}
+        self.inicio = time.monotonic()
+        self.running = False
+
+    def iniciar_worker(self, indice):
+        proceso = self.contexto.Process(
+            target=_ejecutar_worker,
+            args=(self.servidor, indice, self.cola_metricas, self.intervalo_metricas,
+                  self.asincrono, self.nivel_log, self.exportador),
+            name=f"worker-{indice}",
+            daemon=True
+        )
+        proceso.start()
+        self.workers[indice] = proceso
+
+    def ejecutar(self):
+        """Lanza los workers y recoge sus métricas hasta que se interrumpa"""
+        self.running = True
+        print(f"🚀 Supervisor: {self.procesos} workers en {self.servidor.direccion_escucha()} (SO_REUSEPORT)")
+        for indice in range(self.procesos):
+            self.iniciar_worker(indice)
+        if self.puerto_metricas:
+            self.exportador = ExportadorMetricas(self.metricas_prometheus, puerto=self.puerto_metricas).iniciar()
+
+        proximo_resumen = time.monotonic() + self.intervalo_metricas
+        try:
+            while self.running:
+                self.recoger_metricas(timeout=0.5)
+                self.vigilar_workers()
+                if time.monotonic() >= proximo_resumen:
+                    proximo_resumen += self.intervalo_metricas
+                    self.mostrar_resumen()
+        finally:
+            self.detener()
+
+    def recoger_metricas(self, timeout=0.0):
+        """Guarda la última publicación de cada worker"""
+        try:
+            indice, publicacion = self.cola_metricas.get(timeout=timeout)
+            self.metricas_workers[indice] = publicacion
+            while True:
+                indice, publicacion = self.cola_metricas.get_nowait()
+                self.metricas_workers[indice] = publicacion
+        except queue.Empty:
+            pass
+
+    def vigilar_workers(self):
+        """Relanza los workers que hayan terminado inesperadamente
+
+        Si un worker no pudo abrir el puerto se detiene todo: relanzarlo
+        fallaría igual cada vez.
+        """
+        for indice, proceso in list(self.workers.items()):
+            if not proceso.is_alive():
+                if proceso.exitcode == CODIGO_SIN_ESCUCHAR:
+                    raise RuntimeError(f"el worker {indice} no pudo escuchar en "
+                                       f"{self.servidor.direccion_escucha()}")
+                log.warning("⚠️ Worker %s terminó (código %s); relanzando", indice, proceso.exitcode)
+                self.iniciar_worker(indice)
+
+    def instantanea(self):
+        """Métricas agregadas de todos los workers"""
+        agregado = MetricasRobot()
+        conectados = 0
+        por_worker = {}
+        ahora = time.monotonic()
+        for indice, publicacion in sorted(self.metricas_workers.items()):
+            agregado.fusionar(publicacion["agregado"])
+            conectados += publicacion["conectados"]
+            por_worker[indice] = {"robots_conectados": publicacion["conectados"],
+                                  "frames": publicacion["agregado"].frames}
+        agregado.inicio = self.inicio
+        return {
+            "workers": len(self.workers),
+            "robots_conectados": conectados,
+            "agregado": agregado.resumen(ahora),
+            "por_worker": por_worker,
+        }
+
+    def metricas_prometheus(self):
+        """Texto de /metrics con la suma de los workers (con el retraso de intervalo_metricas)
+
+        Cada worker detecta solo las reconexiones que el kernel le vuelve a
+        asignar a él; las que caen en otro worker no se cuentan.
+        """
+        texto = TextoPrometheus()
+        agregado = MetricasRobot()
+        conectados = 0
+        ocupacion = {}
+        conexiones = {"aceptadas": 0, "rechazadas": 0, "reconexiones": 0}
+        for publicacion in list(self.metricas_workers.values()):
+            agregado.fusionar(publicacion["agregado"])
+            conectados += publicacion["conectados"]
+            for nombre, cuenta in publicacion["ocupacion"].items():
+                ocupacion[nombre] = ocupacion.get(nombre, 0) + cuenta
+            for clave in conexiones:
+                conexiones[clave] += publicacion["conexiones"][clave]
+
+        texto.familia("robot_workers", "gauge", "Procesos worker vivos")
+        texto.muestra("robot_workers", sum(1 for proceso in list(self.workers.values()) if proceso.is_alive()))
+        metricas_sesiones(texto, conectados, ocupacion, conexiones)
+        metricas_agregadas(texto, agregado)
+        return texto.texto()
+
+    def mostrar_resumen(self):
+        instantanea = self.instantanea()
+        agregado = instantanea["agregado"]
+        log.info("📈 %s workers | %s robots | %s frames (%s/s) | decisión p99=%sms",
+                 instantanea["workers"], instantanea["robots_conectados"],
+                 agregado["frames"], agregado["frames_por_s"], agregado["decision"]["p99_ms"])
+
+    def detener(self):
+        """Termina todos los workers"""
+        self.running = False
+        if self.exportador is not None:
+            self.exportador.detener()
+        for proceso in self.workers.values():
+            if proceso.is_alive():
+                proceso.terminate()
+        for proceso in self.workers.values():
+            proceso.join(timeout=2)
+        print("✅ Supervisor detenido")
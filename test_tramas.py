@@ -0,0 +1,120 @@
+"""Pruebas de DecodificadorTramas: tramas partidas, juntas y demasiado grandes
+
+    python -m unittest test_tramas
+"""
+import struct
+import unittest
+
+from tramas import DecodificadorTramas, codificar_trama
+
+MAXIMO = 64
+
+
+def decodificar(flujo, modo, trozo=None, tamaño_registro=0):
+    """Alimenta el flujo en trozos de 'trozo' bytes (None = de una vez) y devuelve las tramas"""
+    decodificador = DecodificadorTramas(modo, tamaño_maximo=MAXIMO, tamaño_registro=tamaño_registro)
+    tramas = []
+    trozo = trozo or len(flujo)
+    for i in range(0, len(flujo), trozo):
+        decodificador.alimentar(flujo[i:i + trozo])
+        tramas.extend(bytes(trama) for trama in decodificador.tramas())
+    return tramas, decodificador.descartadas
+
+
+def frames_json(n):
+    return [b'{"objeto": "cuadrado", "tama\\u00f1o": %d}' % i for i in range(n)]
+
+
+class PruebaModoJson(unittest.TestCase):
+
+    def test_partidas_y_juntas(self):
+        frames = frames_json(5)
+        flujo = b"".join(frames[:2]) + b"\n" + b"\n".join(frames[2:])
+        for trozo in (None, 1, 7, 16):
+            with self.subTest(trozo=trozo):
+                self.assertEqual(decodificar(flujo, "json", trozo), (frames, 0))
+
+    def test_llaves_dentro_de_cadenas(self):
+        frame = b'{"objeto": "a}{\\"b", "x": {"y": 1}}'
+        self.assertEqual(decodificar(frame + frame, "json", 3), ([frame, frame], 0))
+
+    def test_texto_solo_con_salto_de_linea(self):
+        flujo = b"cuadr" + b"ado\n" + frames_json(1)[0]
+        self.assertEqual(decodificar(flujo, "json", 5), ([b"cuadrado", frames_json(1)[0]], 0))
+        self.assertEqual(decodificar(b"cuadrado", "json"), ([], 0))
+
+    def test_demasiado_grande(self):
+        grande = b'{"objeto": "' + b"x" * 100 + b'"}'
+        frames = frames_json(5)
+        flujo = grande + b"".join(frames)
+        for trozo in (None, 16):
+            with self.subTest(trozo=trozo):
+                self.assertEqual(decodificar(flujo, "json", trozo), (frames, 1))
+
+
+class PruebaModoLinea(unittest.TestCase):
+
+    def test_partidas_y_juntas(self):
+        frames = [b"cuadrado", b"cilindro", b"nada"]
+        flujo = b"\n".join(frames) + b"\n\n"
+        for trozo in (None, 1, 5):
+            with self.subTest(trozo=trozo):
+                self.assertEqual(decodificar(flujo, "linea", trozo), (frames, 0))
+
+    def test_demasiado_grande(self):
+        frames = [b"cuadrado", b"cilindro"]
+        flujo = b"x" * 100 + b"\n" + b"\n".join(frames) + b"\n"
+        for trozo in (None, 16):
+            with self.subTest(trozo=trozo):
+                self.assertEqual(decodificar(flujo, "linea", trozo), (frames, 1))
+
+
+class PruebaModoLongitud(unittest.TestCase):
+
+    def test_partidas_y_juntas(self):
+        frames = frames_json(5) + [b""]
+        flujo = b"".join(codificar_trama(frame, "longitud") for frame in frames)
+        for trozo in (None, 1, 3, 16):
+            with self.subTest(trozo=trozo):
+                self.assertEqual(decodificar(flujo, "longitud", trozo), (frames, 0))
+
+    def test_demasiado_grande(self):
+        frames = frames_json(5)
+        flujo = codificar_trama(b"x" * 100, "longitud")
+        flujo += b"".join(codificar_trama(frame, "longitud") for frame in frames)
+        for trozo in (None, 1, 16):
+            with self.subTest(trozo=trozo):
+                self.assertEqual(decodificar(flujo, "longitud", trozo), (frames, 1))
+
+    def test_varias_grandes_seguidas(self):
+        grande = codificar_trama(b"x" * 1000, "longitud")
+        valida = codificar_trama(b"ok", "longitud")
+        flujo = grande * 3 + valida + grande + valida
+        self.assertEqual(decodificar(flujo, "longitud", 16), ([b"ok", b"ok"], 4))
+
+    def test_maximo_exacto(self):
+        frame = b"x" * MAXIMO
+        flujo = codificar_trama(frame, "longitud") * 2
+        self.assertEqual(decodificar(flujo, "longitud", 10), ([frame, frame], 0))
+
+
+class PruebaModoFijo(unittest.TestCase):
+
+    def test_partidas_y_juntas(self):
+        registro = struct.Struct("!HI")
+        frames = [registro.pack(i, i * 1000) for i in range(5)]
+        flujo = b"".join(frames)
+        for trozo in (None, 1, 4, 7):
+            with self.subTest(trozo=trozo):
+                self.assertEqual(decodificar(flujo, "fijo", trozo, registro.size), (frames, 0))
+
+    def test_cambio_de_modo_conserva_lo_recibido(self):
+        decodificador = DecodificadorTramas("json")
+        decodificador.alimentar(b"BINARIO\n" + b"abcdefgh")
+        self.assertEqual(bytes(decodificador.siguiente()), b"BINARIO")
+        decodificador.cambiar_modo("fijo", 4)
+        self.assertEqual([bytes(t) for t in decodificador.tramas()], [b"abcd", b"efgh"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+import re
+import struct
+
+# Tokens relevantes para delimitar un objeto JSON: llaves, comillas y escapes
+_TOKENS_JSON = re.compile(rb'\\.|[{}"]', re.DOTALL)
+_CABECERA_LONGITUD = struct.Struct("!I")
+_ESPACIOS = b" \t\r\n"
+
+
+class DecodificadorTramas:
+    """Separa el flujo TCP de un robot en tramas completas, en orden de llegada
+
+    Modos:
+        json      objetos JSON concatenados (lo que envían hoy los clientes),
+                  con o sin salto de línea entre ellos; el texto que no empieza
+                  por '{' es una trama solo cuando llega su salto de línea
+        linea     una trama por línea terminada en '\\n'
+        longitud  cabecera de 4 bytes big-endian con la longitud y luego la trama
+        fijo      registros de tamaño_registro bytes (protocolo binario)
+
+    recibir_desde() lee con recv_into sobre un bloque de la conexión que se
+    reserva en la primera llamada y se reutiliza, así que la recepción no crea
+    un objeto bytes por cada recv; las sesiones que solo usan alimentar() (las
+    de asyncio) nunca lo reservan. Las tramas se devuelven como un único
+    bytearray copiado del buffer.
+
+    Si una trama supera tamaño_maximo se descarta y, en los modos json y
+    linea, también el resto de esa trama cuando llegue: se resincroniza en el
+    siguiente '{' (json) o tras el siguiente salto de línea (linea). En modo
+    longitud se decide al leer la cabecera y se saltan exactamente los bytes
+    declarados, así que las tramas siguientes no se pierden.
+    """
+
+    MODOS = ("json", "linea", "longitud", "fijo")
+
+    def __init__(self, modo="json", tamaño_maximo=65536, tamaño_registro=0, tamaño_recepcion=4096):
+        self.tamaño_maximo = tamaño_maximo
+        self.buffer = bytearray()
+        # Bloque de recepción reutilizado en cada recv_into (se crea al primer recibir_desde)
+        self.tamaño_recepcion = tamaño_recepcion
+        self.bloque = None
+        self._vista_bloque = None
+        self.descartadas = 0
+        self.cambiar_modo(modo, tamaño_registro)
+
+    def cambiar_modo(self, modo, tamaño_registro=0):
+        """Cambia el formato de las tramas siguientes conservando lo ya recibido"""
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo de tramas desconocido: {modo}")
+        if modo == "fijo" and tamaño_registro <= 0:
+            raise ValueError("El modo fijo necesita tamaño_registro")
+        self.modo = modo
+        self.tamaño_registro = tamaño_registro
+        self._resincronizar = False
+        # Bytes que faltan por tirar de una trama con longitud declarada excesiva
+        self._saltar = 0
+
+        self._extraer = {
+            "json": self._extraer_json,
+            "linea": self._extraer_linea,
+            "longitud": self._extraer_longitud,
+            "fijo": self._extraer_fijo,
+        }[modo]
+
+    def alimentar(self, data):
+        """Agrega al buffer los bytes recién recibidos"""
+        self.buffer += data
+
+    def recibir_desde(self, conexion, flags=0):
+        """Lee de la conexión al bloque preasignado y lo agrega al buffer; devuelve los bytes leídos (0 = cierre)"""
+        if self.bloque is None:
+            self.bloque = bytearray(self.tamaño_recepcion)
+            self._vista_bloque = memoryview(self.bloque)
+        leidos = conexion.recv_into(self.bloque, 0, flags)
+        if leidos:
+            self.buffer += self._vista_bloque[:leidos]
+        return leidos
+
+    def siguiente(self):
+        """Devuelve la próxima trama completa (bytearray) o None si falta recibir más"""
+        while True:
+            if self._saltar and not self._saltar_descartada():
+                return None
+            if self._resincronizar and not self._buscar_inicio():
+                return None
+            trama = self._extraer()
+            if trama is None:
+                if self._saltar:
+                    continue
+                if len(self.buffer) > self.tamaño_maximo and self.modo in ("json", "linea"):
+                    # Trama imposible de completar: se descarta para no crecer sin límite
+                    self.buffer.clear()
+                    self.descartadas += 1
+                    self._resincronizar = True
+                return None
+            if len(trama) <= self.tamaño_maximo or self.modo == "fijo":
+                return trama
+            # Llegó entera en una sola lectura pero supera el máximo
+            self.descartadas += 1
+
+    def _saltar_descartada(self):
+        """Tira bytes de la trama descartada en modo longitud; True cuando ya no queda nada"""
+        tirados = min(self._saltar, len(self.buffer))
+        del self.buffer[:tirados]
+        self._saltar -= tirados
+        return not self._saltar
+
+    def _buscar_inicio(self):
+        """Tira el resto de una trama descartada; True cuando el buffer empieza en una trama nueva"""
+        buffer = self.buffer
+        if self.modo == "json":
+            inicio = buffer.find(b"{")
+        else:
+            inicio = buffer.find(b"\n")
+            if inicio >= 0:
+                inicio += 1
+        if inicio < 0:
+            buffer.clear()
+            return False
+        del buffer[:inicio]
+        self._resincronizar = False
+        return True
+
+    def tramas(self):
+        """Itera sobre todas las tramas completas disponibles"""
+        while True:
+            trama = self.siguiente()
+            if trama is None:
+                return
+            yield trama
+
+    def _extraer_linea(self):
+        buffer = self.buffer
+        while True:
+            fin = buffer.find(b"\n")
+            if fin < 0:
+                return None
+            trama = buffer[:fin].strip()
+            del buffer[:fin + 1]
+            if trama:
+                return trama
+
+    def _extraer_longitud(self):
+        buffer = self.buffer
+        if len(buffer) < _CABECERA_LONGITUD.size:
+            return None
+        (longitud,) = _CABECERA_LONGITUD.unpack_from(buffer)
+        if longitud > self.tamaño_maximo:
+            # Se descarta sin esperar a recibirla: siguiente() salta sus bytes
+            del buffer[:_CABECERA_LONGITUD.size]
+            self.descartadas += 1
+            self._saltar = longitud
+            return None
+        fin = _CABECERA_LONGITUD.size + longitud
+        if len(buffer) < fin:
+            return None
+        trama = buffer[_CABECERA_LONGITUD.size:fin]
+        del buffer[:fin]
+        return trama
+
+    def _extraer_fijo(self):
+        buffer = self.buffer
+        fin = self.tamaño_registro
+        if len(buffer) < fin:
+            return None
+        trama = buffer[:fin]
+        del buffer[:fin]
+        return trama
+
+    def _extraer_json(self):
+        buffer = self.buffer
+        inicio = 0
+        while inicio < len(buffer) and buffer[inicio] in _ESPACIOS:
+            inicio += 1
+        if inicio == len(buffer):
+            buffer.clear()
+            return None
+
+        if buffer[inicio] != 0x7B:  # '{'
+            # Texto plano: solo cuando llega el salto de línea (puede venir en varios recv)
+            fin = buffer.find(b"\n", inicio)
+            if fin < 0:
+                return None
+            trama = buffer[inicio:fin].strip()
+            del buffer[:fin + 1]
+            return trama
+
+        fin = _fin_objeto_json(buffer, inicio)
+        if fin < 0:
+            return None
+        trama = buffer[inicio:fin]
+        del buffer[:fin]
+        return trama
+
+
+def _fin_objeto_json(buffer, inicio):
+    """Posición donde termina el objeto JSON que empieza en inicio, o -1 si está incompleto"""
+    profundidad = 0
+    en_cadena = False
+    for token in _TOKENS_JSON.finditer(buffer, inicio):
+        caracter = buffer[token.start()]
+        if caracter == 0x22:  # '"'
+            en_cadena = not en_cadena
+        elif en_cadena:
+            continue
+        elif caracter == 0x7B:  # '{'
+            profundidad += 1
+        elif caracter == 0x7D:  # '}'
+            profundidad -= 1
+            if profundidad == 0:
+                return token.end()
+    return -1
+
+
+def codificar_trama(payload, modo="json"):
+    """Prepara un mensaje para enviarlo con el modo de tramas indicado"""
+    if modo == "longitud":
+        return _CABECERA_LONGITUD.pack(len(payload)) + payload
+    if modo == "linea":
+        return payload + b"\n"
+    return payload
@@ -0,0 +1,292 @@
+"""Transportes intercambiables para servidores y simuladores
+
+Las direcciones indican el transporte:
+
+    tcp://host:puerto      socket TCP (también vale "host:puerto")
+    unix:///ruta/socket    socket de dominio Unix (misma máquina, sin pila TCP)
+    memoria://nombre       canal en el mismo proceso: colas de bytes, sin copias
+                           ni sockets (para pruebas de integración)
+
+escuchar() devuelve un objeto con accept() -> (conexion, id_cliente),
+aceptar_rafaga() -> [(conexion, id_cliente), ...] y close();
+conectar() devuelve una conexión con la interfaz de socket que usa el proyecto
+(send, sendall, recv/recv_into -incluido MSG_DONTWAIT-, settimeout, close).
+"""
+import itertools
+import os
+import queue
+import socket
+import struct
+import threading
+
+# Conexiones que se recogen como máximo en cada ráfaga de accept
+RAFAGA_MAXIMA = 64
+
+
+def parsear_direccion(direccion):
+    """'tcp://h:p' -> ('tcp', (h, p)); 'unix:///x' -> ('unix', '/x'); 'memoria://n' -> ('memoria', 'n')"""
+    esquema, separador, resto = direccion.partition("://")
+    if not separador:
+        esquema, resto = "tcp", direccion
+
+    if esquema == "tcp":
+        host, _, puerto = resto.rpartition(":")
+        return "tcp", (host or "0.0.0.0", int(puerto))
+    if esquema in ("unix", "memoria"):
+        return esquema, resto
+    raise ValueError(f"Transporte desconocido: {direccion!r}")
+
+
+def escuchar(direccion, backlog=5, reuse_port=False):
+    """Abre el punto de escucha del servidor"""
+    esquema, destino = parsear_direccion(direccion)
+
+    if esquema == "memoria":
+        return ListenerMemoria(destino)
+
+    if esquema == "tcp":
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    else:
+        if reuse_port:
+            raise ValueError("SO_REUSEPORT solo está disponible con tcp://")
+        # Un socket de una ejecución anterior impide el bind
+        if os.path.exists(destino):
+            os.unlink(destino)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    sock.bind(destino)
+    sock.listen(backlog)
+    return ListenerSocket(sock, esquema, destino)
+
+
+def configurar_keepalive(sock, inactividad, intervalo, intentos):
+    """Activa el keepalive TCP: el kernel detecta al par que desapareció sin FIN
+
+    Tras 'inactividad' segundos sin tráfico envía sondas cada 'intervalo'
+    segundos y da la conexión por muerta después de 'intentos' sin respuesta.
+    Los sockets Unix y los canales en memoria no lo necesitan y se ignoran.
+    """
+    if getattr(sock, "family", None) not in (socket.AF_INET, socket.AF_INET6):
+        return
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, inactividad)
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, intervalo)
+    if hasattr(socket, "TCP_KEEPCNT"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, intentos)
+    if hasattr(socket, "TCP_USER_TIMEOUT"):
+        # Mismo plazo para datos enviados sin confirmar (un sendall colgado)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_USER_TIMEOUT,
+                        (inactividad + intervalo * intentos) * 1000)
+
+
+def linger_cero(sock):
+    """SO_LINGER 0: el próximo close() envía RST en vez del handshake de FIN"""
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    except OSError:
+        pass
+
+
+def cerrar_con_rst(sock):
+    """Cierra de inmediato: el cliente lo nota al instante y puede reintentar"""
+    linger_cero(sock)
+    sock.close()
+
+
+def conectar(direccion, timeout=None):
+    """Conecta con un servidor; devuelve una conexión con interfaz de socket"""
+    esquema, destino = parsear_direccion(direccion)
+
+    if esquema == "memoria":
+        return ListenerMemoria.conectar(destino, timeout)
+
+    familia = socket.AF_INET if esquema == "tcp" else socket.AF_UNIX
+    sock = socket.socket(familia, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    sock.connect(destino)
+    if esquema == "tcp":
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+class ListenerSocket:
+    """Punto de escucha TCP o Unix"""
+
+    def __init__(self, sock, esquema, destino):
+        self.sock = sock
+        self.esquema = esquema
+        self.destino = destino
+        self._contador = itertools.count(1)
+
+    def accept(self):
+        cliente, address = self.sock.accept()
+        if self.esquema == "tcp":
+            # Los comandos son mensajes cortos: sin esperar a Nagle
+            cliente.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return cliente, f"{address[0]}:{address[1]}"
+        return cliente, f"unix:{next(self._contador)}"
+
+    def aceptar_rafaga(self, maximo=RAFAGA_MAXIMA):
+        """Espera una conexión y recoge sin bloquear las que ya estén en la cola del kernel"""
+        conexiones = [self.accept()]
+        self.sock.setblocking(False)
+        try:
+            while len(conexiones) < maximo:
+                try:
+                    cliente, cliente_id = self.accept()
+                except BlockingIOError:
+                    break
+                cliente.setblocking(True)
+                conexiones.append((cliente, cliente_id))
+        finally:
+            self.sock.setblocking(True)
+        return conexiones
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def setblocking(self, bloqueante):
+        self.sock.setblocking(bloqueante)
+
+    def close(self):
+        self.sock.close()
+        if self.esquema == "unix" and os.path.exists(self.destino):
+            os.unlink(self.destino)
+
+
+# ---------------------------------------------------------------------------
+# Canal en memoria
+# ---------------------------------------------------------------------------
+
+_FIN = object()
+
+
+class ConexionMemoria:
+    """Extremo de un canal en memoria; send() entrega el objeto bytes tal cual al otro extremo"""
+
+    def __init__(self):
+        self.entrada = queue.SimpleQueue()
+        self.otro = None
+        self.timeout = None
+        self._pendiente = b""
+        self._cerrada = False
+
+    @classmethod
+    def par(cls):
+        a, b = cls(), cls()
+        a.otro, b.otro = b, a
+        return a, b
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def setsockopt(self, *args):
+        pass  # las opciones de socket no aplican
+
+    def send(self, data):
+        # Como en TCP/Unix: escribir a un extremo ya cerrado es un error, no una cola sin lector
+        if self._cerrada or self.otro is None or self.otro._cerrada:
+            raise BrokenPipeError("Canal en memoria cerrado")
+        self.otro.entrada.put(bytes(data) if not isinstance(data, bytes) else data)
+        return len(data)
+
+    def sendall(self, data):
+        self.send(data)
+
+    def recv(self, n, flags=0):
+        if not self._pendiente:
+            if self._cerrada:
+                return b""
+            try:
+                if flags & socket.MSG_DONTWAIT:
+                    bloque = self.entrada.get_nowait()
+                elif self.timeout is not None:
+                    bloque = self.entrada.get(timeout=self.timeout)
+                else:
+                    bloque = self.entrada.get()
+            except queue.Empty:
+                if flags & socket.MSG_DONTWAIT:
+                    raise BlockingIOError("No hay datos disponibles") from None
+                raise socket.timeout("timed out") from None
+            if bloque is _FIN:
+                self._cerrada = True
+                return b""
+            if len(bloque) <= n:
+                return bloque
+            self._pendiente = bloque
+
+        datos, self._pendiente = self._pendiente[:n], self._pendiente[n:]
+        return datos
+
+    def shutdown(self, how=socket.SHUT_RDWR):
+        # Despierta un recv() bloqueado en este extremo, como en un socket real
+        self.entrada.put(_FIN)
+        self.close()
+
+    def recv_into(self, buffer, nbytes=0, flags=0):
+        datos = self.recv(nbytes or len(buffer), flags)
+        buffer[:len(datos)] = datos
+        return len(datos)
+
+    def close(self):
+        if not self._cerrada:
+            self._cerrada = True
+            if self.otro is not None:
+                self.otro.entrada.put(_FIN)
+
+
+class ListenerMemoria:
+    """Punto de escucha de un canal en memoria, registrado por nombre en el proceso"""
+
+    _registro = {}
+    _lock = threading.Lock()
+
+    def __init__(self, nombre):
+        with self._lock:
+            if nombre in self._registro:
+                raise OSError(f"memoria://{nombre} ya está en uso")
+            self._registro[nombre] = self
+        self.nombre = nombre
+        self.pendientes = queue.SimpleQueue()
+        self._contador = itertools.count(1)
+
+    @classmethod
+    def conectar(cls, nombre, timeout=None):
+        with cls._lock:
+            listener = cls._registro.get(nombre)
+        if listener is None:
+            raise ConnectionRefusedError(f"Nadie escucha en memoria://{nombre}")
+        cliente, servidor = ConexionMemoria.par()
+        cliente.settimeout(timeout)
+        listener.pendientes.put(servidor)
+        return cliente
+
+    def accept(self):
+        conexion = self.pendientes.get()
+        if conexion is _FIN:
+            raise OSError("Listener en memoria cerrado")
+        return conexion, f"memoria:{next(self._contador)}"
+
+    def aceptar_rafaga(self, maximo=RAFAGA_MAXIMA):
+        conexiones = [self.accept()]
+        while len(conexiones) < maximo:
+            try:
+                conexion = self.pendientes.get_nowait()
+            except queue.Empty:
+                break
+            if conexion is _FIN:
+                self.pendientes.put(_FIN)
+                break
+            conexiones.append((conexion, f"memoria:{next(self._contador)}"))
+        return conexiones
+
+    def close(self):
+        with self._lock:
+            if self._registro.get(self.nombre) is self:
+                del self._registro[self.nombre]
+        self.pendientes.put(_FIN)